@@ -1,29 +1,43 @@
 import os
 import re
+import json
 import logging
 from dotenv import load_dotenv
 from flask import (
     Flask,
-    Response,
     abort,
     jsonify,
     render_template,
     request,
-    stream_with_context,
 )
 from flask_cors import CORS
 from google import genai
 from google.genai import types
 from prompts import *
 from utils import *
+from prompt_parser import *
+from prompt_cache import *
+from deadline import *
+from limits import *
+from patching import *
+from code_store import *
+from streaming import *
+from compression import compress_response
+from logs import configure_logging
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+configure_logging()
+
+logger = logging.getLogger("app")
+
+prompt_cache.load_warm_set(PROMPT_CACHE_WARM_FILE)
 
 app = Flask(__name__)
 
-CORS(app)
+CORS(app, expose_headers=[CODE_HASH_HEADER, "X-Refactor-Mode", "X-Stream-ID"])
+
+app.after_request(compress_response)
+app.before_request(start_deadline)
+app.register_error_handler(DeadlineExceeded, deadline_response)
 
 load_dotenv()
 
@@ -31,35 +45,91 @@ gemini_model = os.getenv("GEMINI_MODEL")
 gemini_model_1 = os.getenv("GEMINI_MODEL_1")
 
 
+def model_client(deadline):
+    if not deadline:
+        return genai.Client()
+
+    timeout = deadline.budget("upstream_connect")
+    return genai.Client(http_options=types.HttpOptions(timeout=int(timeout * 1000)))
+
+
+class ModelStream:
+    def __init__(self, model, contents, system_instruction, marker=TRUNCATION_MARKER):
+        self.model = model
+        self.contents = contents
+        self.system_instruction = system_instruction
+        self.marker = marker
+        self.deadline = current_deadline()
+        self.max_tokens, self.max_bytes = current_output_limits()
+        self.client = model_client(self.deadline)
+        self.tokens = 0
+
+    def __iter__(self):
+        started = False
+        sent = 0
+
+        response = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=self.contents,
+            config=types.GenerateContentConfig(
+                system_instruction=self.system_instruction,
+                max_output_tokens=self.max_tokens,
+            ),
+        )
+
+        try:
+            for chunk in response:
+                usage = chunk.usage_metadata
+                if usage and usage.candidates_token_count:
+                    self.tokens = usage.candidates_token_count
+
+                if not chunk.text:
+                    continue
+
+                started = True
+                size = len(chunk.text.encode("utf-8"))
+
+                if self.max_bytes and sent + size > self.max_bytes:
+                    logger.warning(
+                        "Output exceeded %s bytes, truncating stream", self.max_bytes
+                    )
+                    record_stream("truncated")
+                    yield truncate_utf8(chunk.text, self.max_bytes - sent) + self.marker
+                    return
+
+                sent += size
+                yield chunk.text
+        except Exception as e:
+            stage = "total_stream" if started else "upstream_connect"
+            raise_if_expired(self.deadline, stage, e)
+            raise
+        finally:
+            close_iterator(response)
+
+
 def get_generated_code(problem_description, language):
     try:
         if language not in valid_languages:
-            logging.warning(
-                f"Unsupported language requested for generation: {language}"
+            logger.warning(
+                "Unsupported language requested for generation: %s", language
             )
             return "Error: Unsupported language."
 
-        def stream():
-            client = genai.Client()
+        prompt = generate_code_prompt.format(
+            problem_description=problem_description, language=language
+        )
 
-            response = client.models.generate_content_stream(
-                model=gemini_model,
-                contents=generate_code_prompt.format(
-                    problem_description=problem_description, language=language
-                ),
-                config=types.GenerateContentConfig(
-                    system_instruction=generate_instruction.format(language=language),
-                ),
+        return stream_response(
+            ModelStream(
+                gemini_model, prompt, generate_instruction.format(language=language)
             )
+        )
 
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-
-        return Response(stream_with_context(stream()), mimetype="text/plain")
+    except DeadlineExceeded:
+        raise
 
     except Exception as e:
-        logging.error(f"Error in get_generated_code function: {e}")
+        logger.error("Error in get_generated_code function: %s", e, exc_info=True)
         return ""
 
 
@@ -70,27 +140,19 @@ def get_output(code, language):
                 code=code, time=utc_time_reference()
             )
         else:
-            logging.warning(f"Unsupported language for get_output: {language}")
+            logger.warning("Unsupported language for get_output: %s", language)
             return "Error: Language not supported."
 
-        def stream():
-            client = genai.Client()
-
-            response = client.models.generate_content_stream(
-                model=gemini_model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=compiler_instruction.format(language=language),
-                ),
+        return stream_response(
+            ModelStream(
+                gemini_model, prompt, compiler_instruction.format(language=language)
             )
+        )
+    except DeadlineExceeded:
+        raise
 
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-
-        return Response(stream_with_context(stream()), mimetype="text/plain")
     except Exception as e:
-        logging.error(f"Error in get_output function: {e}")
+        logger.error("Error in get_output function: %s", e, exc_info=True)
         return f"Error: Unable to process the code. {str(e)}"
 
 
@@ -111,26 +173,117 @@ def refactor_code(code, language, output, problem_description=None):
                 code=code, language=language, output=output
             )
 
-        def stream():
-            client = genai.Client()
+        return stream_response(
+            ModelStream(
+                gemini_model,
+                refactor_contnet,
+                refactor_instruction.format(language=language),
+            )
+        )
 
-            response = client.models.generate_content_stream(
-                model=gemini_model,
-                contents=refactor_contnet,
-                config=types.GenerateContentConfig(
-                    system_instruction=refactor_instruction.format(language=language),
-                ),
+    except DeadlineExceeded:
+        raise
+
+    except Exception as e:
+        logger.error("Error in refactor_code function: %s", e, exc_info=True)
+        return ""
+
+
+def refactor_code_patch(
+    code, language, output, problem_description=None, patch_format="diff"
+):
+    if language not in valid_languages:
+        return "Error: Unsupported language."
+
+    code = normalize_newlines(code)
+
+    if problem_description:
+        refactor_contnet = refactor_patch_prompt_user.format(
+            code=code,
+            language=language,
+            problem_description=problem_description,
+            output=output,
+        )
+    else:
+        refactor_contnet = refactor_patch_prompt.format(
+            code=code, language=language, output=output
+        )
+
+    try:
+        edits = "".join(
+            ModelStream(
+                gemini_model,
+                refactor_contnet,
+                refactor_instruction.format(language=language),
+                marker="",
             )
+        )
+        refactored = apply_edit_blocks(code, parse_edit_blocks(edits))
+
+    except DeadlineExceeded:
+        raise
+
+    except Exception as e:
+        logger.warning("Patch refactor failed, falling back to full output: %s", e)
+        response = refactor_code(code, language, output, problem_description)
+        if not isinstance(response, str):
+            response.headers["X-Refactor-Mode"] = "full"
+        return response
+
+    if patch_format == "edits":
+        response = jsonify({"edits": edit_list(code, refactored)})
+    else:
+        response = stream_response(
+            unified_diff(code, refactored), mimetype="text/x-diff"
+        )
+
+    response.headers["X-Refactor-Mode"] = "patch"
+    return response
 
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
 
-        return Response(stream_with_context(stream()), mimetype="text/plain")
+def request_improved_prompts(prompt_template):
+    deadline = current_deadline()
+    client = model_client(deadline)
 
+    try:
+        response = client.models.generate_content(
+            model=gemini_model,
+            config=types.GenerateContentConfig(
+                system_instruction=system_improve_prompt,
+                max_output_tokens=current_output_limits()[0],
+            ),
+            contents=prompt_template,
+        )
     except Exception as e:
-        logging.error(f"Error in refactor_code function: {e}")
-        return ""
+        raise_if_expired(deadline, "upstream_response", e)
+        raise
+
+    is_valid, parsed = validate_json(response.text)
+    return parsed if is_valid else None
+
+
+def improve_prompt_stream(chunks, language, topic):
+    parser = PromptStreamParser()
+    prompts = {}
+
+    try:
+        for text in chunks:
+            for key, value in parser.feed(text):
+                check_prompt(key, value)
+                prompts[key] = value
+                yield json.dumps({key: value}) + "\n"
+
+            if parser.done:
+                break
+
+        check_prompt_set(parser, prompts)
+
+    except PromptParseError as e:
+        logger.error("Prompt JSON parsing failed mid-stream: %s", e)
+        yield json.dumps({"error": "Invalid prompt format"}) + "\n"
+        return
+
+    prompt_cache.set(language, topic, prompts)
 
 
 def refactor_code_html_css_js(language, prompt, params, problem_description=None):
@@ -143,42 +296,40 @@ def refactor_code_html_css_js(language, prompt, params, problem_description=None
         else:
             formatted_prompt = prompt.format(**params)
 
-        client = genai.Client()
+        deadline = current_deadline()
+        client = model_client(deadline)
 
-        response = client.models.generate_content(
-            model=gemini_model_1,
-            contents=formatted_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=refactor_instruction.format(language=language),
-            ),
-        )
+        try:
+            response = client.models.generate_content(
+                model=gemini_model_1,
+                contents=formatted_prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=refactor_instruction.format(language=language),
+                    max_output_tokens=current_output_limits()[0],
+                ),
+            )
+        except Exception as e:
+            raise_if_expired(deadline, "upstream_response", e)
+            raise
 
         result = response.text.strip()
         return result
+    except DeadlineExceeded:
+        raise
+
     except Exception as e:
-        logging.error(f"Error in refactor_code_html_css_js function: {e}")
+        logger.error(
+            "Error in refactor_code_html_css_js function: %s", e, exc_info=True
+        )
         return f"Error: {e}"
 
 
 def generate_html(prompt):
     formatted_prompt = html_prompt.format(prompt=prompt, time=utc_time_reference())
 
-    def stream():
-        client = genai.Client()
-
-        response = client.models.generate_content_stream(
-            model=gemini_model_1,
-            contents=formatted_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=html_generate_instruction,
-            ),
-        )
-
-        for chunk in response:
-            if chunk.text:
-                yield chunk.text
-
-    return Response(stream_with_context(stream()), mimetype="text/plain")
+    return stream_response(
+        ModelStream(gemini_model_1, formatted_prompt, html_generate_instruction)
+    )
 
 
 def generate_css(html_content, project_description):
@@ -188,22 +339,9 @@ def generate_css(html_content, project_description):
         time=utc_time_reference(),
     )
 
-    def stream():
-        client = genai.Client()
-
-        response = client.models.generate_content_stream(
-            model=gemini_model_1,
-            contents=formatted_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=css_generate_instruction,
-            ),
-        )
-
-        for chunk in response:
-            if chunk.text:
-                yield chunk.text
-
-    return Response(stream_with_context(stream()), mimetype="text/plain")
+    return stream_response(
+        ModelStream(gemini_model_1, formatted_prompt, css_generate_instruction)
+    )
 
 
 def generate_js(html_content, css_content, project_description):
@@ -214,131 +352,174 @@ def generate_js(html_content, css_content, project_description):
         time=utc_time_reference(),
     )
 
-    def stream():
-        client = genai.Client()
-
-        response = client.models.generate_content_stream(
-            model=gemini_model_1,
-            contents=formatted_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=js_generate_instruction,
-            ),
-        )
-
-        for chunk in response:
-            if chunk.text:
-                yield chunk.text
-
-    return Response(stream_with_context(stream()), mimetype="text/plain")
+    return stream_response(
+        ModelStream(gemini_model_1, formatted_prompt, js_generate_instruction)
+    )
 
 
 @app.route("/")
 def index():
-    logging.info("Serving index page.")
+    logger.info("Serving index page.")
     return render_template("index.html")
 
 
+@app.route("/stats/streams", methods=["GET"])
+@admin_required
+def stream_stats_api():
+    return jsonify(stream_stats_snapshot())
+
+
+@app.route("/stream/<stream_id>", methods=["GET"])
+@token_required
+def resume_stream(stream_id):
+    logger.info("Received request to resume stream: %s", stream_id)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "lastEventId"
+    )
+
+    return resume_response(stream_id, last_event_id, request.user.get("userId"))
+
+
 @app.route("/generate_code", methods=["POST"])
 @token_required
 def generate_code():
-    logging.info("Received request for /generate_code")
+    logger.info("Received request for /generate_code")
 
     try:
         token = request.headers.get("X-Recaptcha-Token")
 
         if not is_human(token):
-            logging.warning("reCAPTCHA verification failed for /generate_code.")
+            logger.warning("reCAPTCHA verification failed for /generate_code.")
             abort(403, description="reCAPTCHA verification failed.")
 
         problem_description = request.json["problem_description"]
         language = request.json["language"]
 
-        logging.info(f"Generating code for language: {language}")
+        logger.info("Generating code for language: %s", language)
         return get_generated_code(problem_description, language)
 
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
     except Exception as e:
-        logging.error(f"Error in /generate_code endpoint: {e}")
+        logger.error("Error in /generate_code endpoint: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 400
 
 
 @app.route("/get-output", methods=["POST"])
 def get_output_api():
-    logging.info("Received request for /get-output")
+    logger.info("Received request for /get-output")
 
     try:
         token = request.headers.get("X-Recaptcha-Token")
 
         if not is_human(token):
-            logging.warning("reCAPTCHA verification failed for /get-output.")
+            logger.warning("reCAPTCHA verification failed for /get-output.")
             abort(403, description="reCAPTCHA verification failed.")
 
-        code = request.json["code"]
+        code = resolve_code(request.json)
         language = request.json["language"]
 
         if not code or not language:
-            logging.warning("Missing code or language in /get-output request.")
+            logger.warning("Missing code or language in /get-output request.")
             return jsonify({"error": "Missing code or language"}), 400
 
         if len(code.encode("utf-8")) > MAX_SIZE:
-            logging.warning("Code size exceeds maximum allowed limit.")
+            logger.warning("Code size exceeds maximum allowed limit.")
             return jsonify({"error": "Code size exceeds the 0.5 MB limit"}), 413
-        
+
+        digest = code_store.put(code)
         code = f"\n\n{code}\n\n"
 
-        logging.info(f"Getting output for language: {language}")
+        logger.info("Getting output for language: %s", language)
 
-        return get_output(code, language)
+        return with_code_hash(get_output(code, language), digest)
+
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
+    except BaseMissing as e:
+        return base_missing_response(e)
+
+    except DeltaError as e:
+        logger.warning("Invalid delta in /get-output request: %s", e)
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
-        logging.error(f"Error in /get-output endpoint: {e}")
+        logger.error("Error in /get-output endpoint: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 400
 
 
 @app.route("/refactor_code", methods=["POST"])
 @token_required
 def refactor_code_api():
-    logging.info("Received request for /refactor_code")
+    logger.info("Received request for /refactor_code")
 
     try:
         token = request.headers.get("X-Recaptcha-Token")
 
         if not is_human(token):
-            logging.warning("reCAPTCHA verification failed for /refactor_code.")
+            logger.warning("reCAPTCHA verification failed for /refactor_code.")
             abort(403, description="reCAPTCHA verification failed.")
 
-        code = request.json["code"]
+        code = resolve_code(request.json)
         language = request.json["language"]
         problem_description = request.json["problem_description"]
         output = request.json["output"]
 
         if not code or not language:
-            logging.warning("Missing code or language in /refactor_code request.")
+            logger.warning("Missing code or language in /refactor_code request.")
             return jsonify({"error": "Missing code or language"}), 400
 
         if len(code.encode("utf-8")) > MAX_SIZE:
-            logging.warning("Code size exceeds maximum allowed limit.")
+            logger.warning("Code size exceeds maximum allowed limit.")
             return jsonify({"error": "Code size exceeds the 0.5 MB limit"}), 413
 
-        logging.info(f"Refactoring code for language: {language}")
+        digest = code_store.put(code)
+
+        logger.info("Refactoring code for language: %s", language)
+
+        if request.json.get("mode") == "patch":
+            patch_format = request.json.get("patch_format", "diff")
+            if patch_format not in PATCH_FORMATS:
+                return jsonify({"error": "Invalid patch_format"}), 400
+            return with_code_hash(
+                refactor_code_patch(
+                    code, language, output, problem_description, patch_format
+                ),
+                digest,
+            )
 
         if problem_description:
-            return refactor_code(code, language, output, problem_description)
+            response = refactor_code(code, language, output, problem_description)
         else:
-            return refactor_code(code, language, output)
+            response = refactor_code(code, language, output)
+        return with_code_hash(response, digest)
+
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
+    except BaseMissing as e:
+        return base_missing_response(e)
+
+    except DeltaError as e:
+        logger.warning("Invalid delta in /refactor_code request: %s", e)
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
-        logging.error(f"Error in /refactor_code endpoint: {e}")
+        logger.error("Error in /refactor_code endpoint: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 400
 
 
 @app.route("/improve-prompt", methods=["POST"])
 @token_required
 def improve_prompt():
-    logging.info("Received request for /improve-prompt")
+    logger.info("Received request for /improve-prompt")
     token = request.headers.get("X-Recaptcha-Token")
 
     if not is_human(token):
-        logging.warning("reCAPTCHA verification failed for /improve-prompt.")
+        logger.warning("reCAPTCHA verification failed for /improve-prompt.")
         abort(403, description="reCAPTCHA verification failed.")
 
     data = request.get_json()
@@ -353,46 +534,63 @@ def improve_prompt():
     if not language or language not in {"htmlcssjs"} | valid_languages:
         return jsonify({"error": "Invalid or missing language"}), 400
 
-    try:
-        client = genai.Client()
+    cached = prompt_cache.get(language, topic)
+
+    if cached is not None:
+        logger.info("Serving improved prompts from cache")
 
+        if data.get("stream"):
+            return stream_response(
+                (json.dumps({key: value}) + "\n" for key, value in cached.items()),
+                mimetype="application/x-ndjson",
+                coalesce_chunks=False,
+            )
+
+        return jsonify({"prompts": cached})
+
+    try:
         prompt_template = improve_prompts[language].format(topic=topic)
 
-        response = client.models.generate_content(
-            model=gemini_model,
-            config=types.GenerateContentConfig(
-                system_instruction=system_improve_prompt,
-            ),
-            contents=prompt_template,
-        )
+        if data.get("stream"):
+            logger.info("Streaming improved prompts for topic")
+            chunks = ModelStream(
+                gemini_model, prompt_template, system_improve_prompt, marker=""
+            )
+            return stream_response(
+                improve_prompt_stream(chunks, language, topic),
+                mimetype="application/x-ndjson",
+                coalesce_chunks=False,
+            )
 
-        gemini_output = response.text
-        is_valid, parsed = validate_json(gemini_output)
+        parsed = request_improved_prompts(prompt_template)
 
-        if not is_valid:
-            logging.error("Invalid JSON response from Gemini for prompt improvement.")
+        if parsed is None:
+            logger.error("Invalid JSON response from Gemini for prompt improvement.")
             return jsonify({"error": "Invalid prompt format"}), 400
 
-        logging.info(f"Successfully improved prompts for topic")
+        prompt_cache.set(language, topic, parsed)
+
+        logger.info("Successfully improved prompts for topic")
 
         return jsonify({"prompts": parsed})
 
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
     except Exception as e:
-        logging.error(f"Error in /improve-prompt endpoint: {e}")
+        logger.error("Error in /improve-prompt endpoint: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/htmlcssjsgenerate-code", methods=["POST"])
 @token_required
 def htmlcssjs_generate_stream():
-    logging.info("Received request for /htmlcssjsgenerate-code")
+    logger.info("Received request for /htmlcssjsgenerate-code")
 
     try:
         token = request.headers.get("X-Recaptcha-Token")
         if not is_human(token):
-            logging.warning(
-                "reCAPTCHA verification failed for /htmlcssjsgenerate-code."
-            )
+            logger.warning("reCAPTCHA verification failed for /htmlcssjsgenerate-code.")
             abort(403, description="reCAPTCHA verification failed.")
 
         data = request.get_json()
@@ -407,7 +605,7 @@ def htmlcssjs_generate_stream():
         if code_type not in {"html", "css", "js"}:
             return jsonify({"error": "Invalid or missing 'type' parameter"}), 400
 
-        logging.info(f"Generating {code_type} code")
+        logger.info("Generating %s code", code_type)
 
         generators = {
             "html": lambda: generate_html(prompt),
@@ -417,22 +615,23 @@ def htmlcssjs_generate_stream():
 
         return generators[code_type]()
 
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
     except Exception as e:
-        logging.error(f"Error in /htmlcssjsgenerate-code endpoint: {e}")
+        logger.error("Error in /htmlcssjsgenerate-code endpoint: %s", e, exc_info=True)
         return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
 @app.route("/htmlcssjsrefactor-code", methods=["POST"])
 @token_required
 def htmlcssjs_refactor():
-    logging.info("Received request for /htmlcssjsrefactor-code")
+    logger.info("Received request for /htmlcssjsrefactor-code")
     try:
         token = request.headers.get("X-Recaptcha-Token")
 
         if not is_human(token):
-            logging.warning(
-                "reCAPTCHA verification failed for /htmlcssjsrefactor-code."
-            )
+            logger.warning("reCAPTCHA verification failed for /htmlcssjsrefactor-code.")
             abort(403, description="reCAPTCHA verification failed.")
 
         data = request.get_json()
@@ -442,15 +641,15 @@ def htmlcssjs_refactor():
         js_content = data.get("js") if len(data.get("js", "")) > 0 else ""
 
         if len(html_content.encode("utf-8")) > MAX_SIZE:
-            logging.warning("HTML content exceeds 0.5 MB limit.")
+            logger.warning("HTML content exceeds 0.5 MB limit.")
             return jsonify({"error": "HTML content exceeds the 0.5 MB limit."}), 413
 
         if len(css_content.encode("utf-8")) > MAX_SIZE:
-            logging.warning("CSS content exceeds 0.5 MB limit.")
+            logger.warning("CSS content exceeds 0.5 MB limit.")
             return jsonify({"error": "CSS content exceeds the 0.5 MB limit."}), 413
 
         if len(js_content.encode("utf-8")) > MAX_SIZE:
-            logging.warning("JS content exceeds 0.5 MB limit.")
+            logger.warning("JS content exceeds 0.5 MB limit.")
             return jsonify({"error": "JS content exceeds the 0.5 MB limit."}), 413
 
         code_type = data.get("type")
@@ -463,7 +662,7 @@ def htmlcssjs_refactor():
         if not code_type:
             return jsonify({"error": "Type is required."}), 400
 
-        logging.info(f"Refactoring htmlcssjs code for type: {code_type}")
+        logger.info("Refactoring htmlcssjs code for type: %s", code_type)
 
         if code_type == "html" and html_content and problem_description:
             html_content_refactored = refactor_code_html_css_js(
@@ -626,8 +825,11 @@ def htmlcssjs_refactor():
                 400,
             )
 
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+
     except Exception as e:
-        logging.error(f"Error in /htmlcssjsrefactor-code endpoint: {e}")
+        logger.error("Error in /htmlcssjsrefactor-code endpoint: %s", e, exc_info=True)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
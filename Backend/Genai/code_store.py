@@ -0,0 +1,184 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from flask import Response, jsonify
+from dotenv import load_dotenv
+from deadline import DEADLINE_REDIS
+
+load_dotenv()
+
+CODE_STORE_BACKEND = os.getenv("CODE_STORE_BACKEND", "memory").lower()
+CODE_STORE_MAX_BYTES = int(os.getenv("CODE_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+CODE_STORE_TTL = int(os.getenv("CODE_STORE_TTL", "3600"))
+
+CODE_HASH_HEADER = "X-Code-Hash"
+
+logger = logging.getLogger("code_store")
+
+
+class BaseMissing(Exception):
+    def __init__(self, base_hash):
+        super().__init__(f"Base code not found: {base_hash}")
+        self.base_hash = base_hash
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def code_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class MemoryCodeStore:
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.blobs = OrderedDict()
+        self.size = 0
+
+    def get(self, digest):
+        with self.lock:
+            entry = self.blobs.get(digest)
+            if entry is None:
+                return None
+
+            code, size, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.blobs[digest]
+                self.size -= size
+                return None
+
+            self.blobs[digest] = (code, size, time.monotonic())
+            self.blobs.move_to_end(digest)
+            return code
+
+    def put(self, code):
+        digest = code_hash(code)
+        size = len(code.encode("utf-8"))
+        if size > self.max_bytes:
+            return digest
+
+        with self.lock:
+            entry = self.blobs.pop(digest, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+            self.blobs[digest] = (code, size, time.monotonic())
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, evicted, _) = self.blobs.popitem(last=False)
+                self.size -= evicted
+
+        return digest
+
+
+class RedisCodeStore:
+    def __init__(self, ttl):
+        import redis
+
+        self.ttl = ttl
+        self.client = redis.StrictRedis(
+            host=os.getenv("REDIS_HOST"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            password=os.getenv("REDIS_PASSWORD"),
+            ssl=True,
+            socket_timeout=DEADLINE_REDIS,
+            socket_connect_timeout=DEADLINE_REDIS,
+        )
+
+    def get(self, digest):
+        try:
+            code = self.client.getex(f"code:{digest}", ex=self.ttl)
+        except Exception as e:
+            logger.error("Could not read code blob %s: %s", digest, e, exc_info=True)
+            return None
+        return code.decode("utf-8") if code is not None else None
+
+    def put(self, code):
+        digest = code_hash(code)
+        try:
+            self.client.set(f"code:{digest}", code.encode("utf-8"), ex=self.ttl)
+        except Exception as e:
+            logger.error("Could not store code blob %s: %s", digest, e, exc_info=True)
+        return digest
+
+
+def create_code_store():
+    if CODE_STORE_BACKEND == "redis":
+        logger.info("Using Redis code store for delta uploads.")
+        return RedisCodeStore(CODE_STORE_TTL)
+
+    return MemoryCodeStore(CODE_STORE_MAX_BYTES, CODE_STORE_TTL)
+
+
+code_store = create_code_store()
+
+
+def apply_delta(base, delta):
+    if not isinstance(delta, list):
+        raise DeltaError("delta must be a list of operations")
+
+    parts = []
+    position = 0
+
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        elif isinstance(op, int) and not isinstance(op, bool) and op > 0:
+            if position + op > len(base):
+                raise DeltaError("delta copies past the end of the base code")
+            parts.append(base[position : position + op])
+            position += op
+        elif isinstance(op, int) and not isinstance(op, bool) and op < 0:
+            if position - op > len(base):
+                raise DeltaError("delta skips past the end of the base code")
+            position -= op
+        else:
+            raise DeltaError(f"Invalid delta operation: {op!r}")
+
+    parts.append(base[position:])
+    return "".join(parts)
+
+
+def resolve_code(payload):
+    base_hash = payload.get("base_hash")
+    if not base_hash:
+        return payload["code"]
+
+    expected = payload.get("code_hash")
+    if not expected:
+        raise DeltaError("delta uploads require code_hash")
+
+    base = code_store.get(base_hash)
+    if base is None:
+        raise BaseMissing(base_hash)
+
+    code = apply_delta(base, payload.get("delta", []))
+
+    if code_hash(code) != expected:
+        logger.warning("Delta against %s rebuilt code with the wrong hash", base_hash)
+        raise BaseMissing(base_hash)
+
+    return code
+
+
+def base_missing_response(e):
+    logger.info("Base code missing for delta upload: %s", e.base_hash)
+    return (
+        jsonify(
+            {"error": "Base code not found, resend full code", "base_hash": e.base_hash}
+        ),
+        409,
+    )
+
+
+def with_code_hash(response, digest):
+    if digest and isinstance(response, Response):
+        response.headers[CODE_HASH_HEADER] = digest
+    return response
@@ -0,0 +1,87 @@
+import os
+import time
+import logging
+from flask import g, has_request_context, jsonify, request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+DEADLINE_CAPTCHA = float(os.getenv("DEADLINE_CAPTCHA", "10"))
+DEADLINE_REDIS = float(os.getenv("DEADLINE_REDIS", "2"))
+DEADLINE_FIRST_CHUNK = float(os.getenv("DEADLINE_FIRST_CHUNK", "60"))
+
+DEFAULT_ENDPOINT_DEADLINES = {
+    "/generate_code": 120,
+    "/get-output": 60,
+    "/refactor_code": 120,
+    "/improve-prompt": 30,
+    "/htmlcssjsgenerate-code": 180,
+    "/htmlcssjsrefactor-code": 120,
+}
+
+ENDPOINT_DEADLINES = {
+    path: float(
+        os.getenv("DEADLINE_" + path.strip("/").replace("-", "_").upper(), default)
+    )
+    for path, default in DEFAULT_ENDPOINT_DEADLINES.items()
+}
+
+logger = logging.getLogger("deadline")
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage):
+        super().__init__(f"Deadline exceeded at stage: {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def budget(self, stage, cap=None):
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(stage)
+        return min(remaining, cap) if cap else remaining
+
+
+def raise_if_expired(deadline, stage, error):
+    if deadline and deadline.expired():
+        raise DeadlineExceeded(stage) from error
+
+
+def start_deadline():
+    default = ENDPOINT_DEADLINES.get(request.path)
+    if default is None:
+        return
+
+    seconds = default
+    requested = request.headers.get(REQUEST_TIMEOUT_HEADER)
+    if requested:
+        try:
+            seconds = min(default, max(float(requested), 0))
+        except ValueError:
+            logger.warning("Ignoring invalid %s header", REQUEST_TIMEOUT_HEADER)
+
+    g.deadline = Deadline(seconds)
+
+
+def current_deadline():
+    if not has_request_context():
+        return None
+    return g.get("deadline")
+
+
+def deadline_response(e):
+    logger.warning("Deadline exceeded for %s at stage: %s", request.path, e.stage)
+    return jsonify({"error": "Deadline exceeded", "stage": e.stage}), 504
@@ -0,0 +1,40 @@
+import os
+from flask import has_request_context, request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRUNCATION_MARKER = "\n\n[Output truncated]"
+
+DEFAULT_OUTPUT_LIMITS = {
+    "/generate_code": (8192, 256 * 1024),
+    "/get-output": (4096, 64 * 1024),
+    "/refactor_code": (65536, 1024 * 1024),
+    "/improve-prompt": (2048, 16 * 1024),
+    "/htmlcssjsgenerate-code": (32768, 512 * 1024),
+    "/htmlcssjsrefactor-code": (32768, 512 * 1024),
+}
+
+
+def endpoint_setting(prefix, path, default):
+    name = prefix + path.strip("/").replace("-", "_").upper()
+    return int(os.getenv(name, default))
+
+
+OUTPUT_LIMITS = {
+    path: (
+        endpoint_setting("MAX_OUTPUT_TOKENS_", path, max_tokens),
+        endpoint_setting("MAX_OUTPUT_BYTES_", path, max_bytes),
+    )
+    for path, (max_tokens, max_bytes) in DEFAULT_OUTPUT_LIMITS.items()
+}
+
+
+def current_output_limits():
+    if not has_request_context():
+        return None, None
+    return OUTPUT_LIMITS.get(request.path, (None, None))
+
+
+def truncate_utf8(text, max_bytes):
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
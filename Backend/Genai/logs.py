@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "werkzeug=WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "0"))
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SuccessSampler(logging.Filter):
+    def __init__(self, sample_rate, rate_limit):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.tokens = rate_limit
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+
+        if self.rate_limit <= 0:
+            return True
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.rate_limit, self.tokens + (now - self.updated) * self.rate_limit
+            )
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+listener = None
+
+
+def start_listener(handler):
+    global listener
+
+    listener = QueueListener(handler.queue, logging.StreamHandler())
+    listener.start()
+
+
+def stop_listener():
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def configure_logging():
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return
+
+    handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(SuccessSampler(LOG_SAMPLE_RATE, LOG_RATE_LIMIT))
+
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+
+    for entry in filter(None, LOG_LEVELS.split(",")):
+        name, _, level = entry.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    start_listener(handler)
+    atexit.register(stop_listener)
+
+
+def restart_logging():
+    global listener
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            listener = None
+            handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+            start_listener(handler)
@@ -0,0 +1,85 @@
+import re
+import difflib
+
+NO_CHANGES = "NO_CHANGES"
+SEARCH_MARKER = "<<<<<<< SEARCH"
+PATCH_FORMATS = ("diff", "edits")
+
+EDIT_BLOCK_REGEX = re.compile(
+    r"^<<<<<<< SEARCH\n(.*?)^=======\n(.*?)^>>>>>>> REPLACE$", re.S | re.M
+)
+
+
+class PatchError(Exception):
+    pass
+
+
+def normalize_newlines(text):
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_edit_blocks(text):
+    text = normalize_newlines(text)
+    blocks = [(search, replace) for search, replace in EDIT_BLOCK_REGEX.findall(text)]
+
+    if not blocks:
+        if text.strip().strip("`").strip() == NO_CHANGES:
+            return []
+        raise PatchError("No edit blocks found in model output")
+
+    if text.count(SEARCH_MARKER) != len(blocks):
+        raise PatchError("Model output contains incomplete edit blocks")
+
+    return blocks
+
+
+def apply_edit_blocks(code, blocks):
+    trailing_newline = code.endswith("\n")
+    if not trailing_newline:
+        code += "\n"
+
+    for index, (search, replace) in enumerate(blocks, start=1):
+        if not search.strip():
+            raise PatchError(f"Edit block {index} has an empty SEARCH section")
+
+        matches = code.count(search)
+        if matches != 1:
+            raise PatchError(
+                f"Edit block {index} SEARCH section matched {matches} times"
+            )
+
+        code = code.replace(search, replace, 1)
+
+    if not trailing_newline and code.endswith("\n"):
+        code = code[:-1]
+    return code
+
+
+def unified_diff(original, refactored, path="code"):
+    for line in difflib.unified_diff(
+        original.splitlines(keepends=True),
+        refactored.splitlines(keepends=True),
+        fromfile=f"a/{path}",
+        tofile=f"b/{path}",
+    ):
+        if line.endswith("\n"):
+            yield line
+        else:
+            yield line + "\n\\ No newline at end of file\n"
+
+
+def edit_list(original, refactored):
+    original_lines = original.splitlines(keepends=True)
+    refactored_lines = refactored.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, original_lines, refactored_lines)
+
+    return [
+        {
+            "op": tag,
+            "start_line": i1 + 1,
+            "delete_count": i2 - i1,
+            "insert": "".join(refactored_lines[j1:j2]),
+        }
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
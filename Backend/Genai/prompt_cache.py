@@ -0,0 +1,88 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "2048"))
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "86400"))
+PROMPT_CACHE_WARM_FILE = os.getenv("PROMPT_CACHE_WARM_FILE", "warm_prompts.json")
+
+logger = logging.getLogger("prompt_cache")
+
+
+def normalize_topic(topic):
+    return " ".join(re.sub(r"[^\w\s]", " ", topic.lower()).split())
+
+
+class PromptCache:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.warm = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, language, topic):
+        key = (language, normalize_topic(topic))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self.entries[key]
+                entry = None
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            prompts = self.warm.get(key)
+            if prompts is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return prompts
+
+    def set(self, language, topic, prompts):
+        key = (language, normalize_topic(topic))
+
+        with self.lock:
+            self.entries[key] = (prompts, time.monotonic())
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def load_warm_set(self, path):
+        try:
+            with open(path, encoding="utf-8") as warm_file:
+                warm_set = json.load(warm_file)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.error(
+                "Could not load warm prompt set from %s: %s", path, e, exc_info=True
+            )
+            return 0
+
+        warm = {}
+        for language, topics in warm_set.get("prompts", {}).items():
+            for topic, prompts in topics.items():
+                warm[(language, normalize_topic(topic))] = prompts
+
+        with self.lock:
+            self.warm = warm
+
+        logger.info("Loaded %s warm prompt sets from %s", len(warm), path)
+        return len(warm)
+
+
+prompt_cache = PromptCache(PROMPT_CACHE_MAX_ENTRIES, PROMPT_CACHE_TTL)
@@ -0,0 +1,150 @@
+import re
+
+PROMPT_KEY_REGEX = re.compile(r"^prompt_\d+$")
+STRING_STOP_REGEX = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+
+ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "b": "\b",
+    "f": "\f",
+    "/": "/",
+    "\\": "\\",
+    '"': '"',
+    "'": "'",
+}
+
+SEEK, KEY, COLON, VALUE, AFTER_VALUE, DONE = range(6)
+
+
+class PromptParseError(Exception):
+    pass
+
+
+class PromptStreamParser:
+    def __init__(self):
+        self.state = SEEK
+        self.buffer = ""
+        self.pos = 0
+        self.key = None
+        self.quote = None
+        self.parts = []
+
+    def feed(self, text):
+        self.buffer = self.buffer[self.pos :] + text
+        self.pos = 0
+        pairs = []
+
+        while self.pos < len(self.buffer) and self.state != DONE:
+            if self.state in (KEY, VALUE) and self.quote:
+                value = self._read_string()
+                if value is None:
+                    break
+                if self.state == KEY:
+                    self.key, self.state = value, COLON
+                else:
+                    pairs.append((self.key, value))
+                    self.key, self.state = None, AFTER_VALUE
+                continue
+
+            char = self.buffer[self.pos]
+            self.pos += 1
+
+            if char.isspace():
+                continue
+
+            if self.state == SEEK:
+                if char == "{":
+                    self.state = KEY
+            elif self.state == KEY:
+                if char in "\"'":
+                    self.quote = char
+                elif char == "}":
+                    self.state = DONE
+                elif char != ",":
+                    raise PromptParseError(f"Unexpected character {char!r} in key")
+            elif self.state == COLON:
+                if char != ":":
+                    raise PromptParseError(f"Expected ':' after key {self.key!r}")
+                self.state = VALUE
+            elif self.state == VALUE:
+                if char not in "\"'":
+                    raise PromptParseError(f"Value for {self.key!r} is not a string")
+                self.quote = char
+            elif self.state == AFTER_VALUE:
+                if char == ",":
+                    self.state = KEY
+                elif char == "}":
+                    self.state = DONE
+                else:
+                    raise PromptParseError(f"Unexpected character {char!r}")
+
+        return pairs
+
+    def _read_string(self):
+        buffer, stop = self.buffer, STRING_STOP_REGEX[self.quote]
+
+        while True:
+            match = stop.search(buffer, self.pos)
+            if match is None:
+                self.parts.append(buffer[self.pos :])
+                self.pos = len(buffer)
+                return None
+
+            end = match.start()
+            self.parts.append(buffer[self.pos : end])
+            self.pos = end
+
+            if buffer[end] == self.quote:
+                self.pos = end + 1
+                value, self.parts, self.quote = "".join(self.parts), [], None
+                return value
+
+            if end + 1 >= len(buffer):
+                return None
+
+            escape = buffer[end + 1]
+            if escape == "u":
+                if end + 6 > len(buffer):
+                    return None
+                try:
+                    self.parts.append(chr(int(buffer[end + 2 : end + 6], 16)))
+                except ValueError:
+                    raise PromptParseError("Invalid unicode escape")
+                self.pos = end + 6
+            else:
+                self.parts.append(ESCAPES.get(escape, escape))
+                self.pos = end + 2
+
+    @property
+    def done(self):
+        return self.state == DONE
+
+
+def is_valid_prompt(key, value):
+    return bool(PROMPT_KEY_REGEX.match(key)) and bool(value.strip())
+
+
+def check_prompt(key, value):
+    if not is_valid_prompt(key, value):
+        raise PromptParseError(f"Invalid prompt entry: {key!r}")
+
+
+def check_prompt_set(parser, prompts):
+    if not parser.done:
+        raise PromptParseError("Incomplete JSON object")
+    if not prompts:
+        raise PromptParseError("No prompts in JSON object")
+
+
+def parse_prompts(text):
+    parser = PromptStreamParser()
+    prompts = {}
+
+    for key, value in parser.feed(text):
+        check_prompt(key, value)
+        prompts[key] = value
+
+    check_prompt_set(parser, prompts)
+    return prompts
@@ -1268,3 +1268,63 @@ If there are errors in the original code, indicate them with inline comments in
 
 If the code is already correct and well-formatted, simply return the original code. If the code cannot be parsed as valid {language}, return "Language not supported."
 """
+
+refactor_patch_prompt = """
+Refactor the following code written in {language}. Focus on fixing errors, improving readability, and following common coding conventions for the language.
+
+```
+{code}
+```
+
+This was the output of the {language} code:
+
+{output}
+
+*INSTRUCTIONS*
+
+Do *not* return the whole file. Return *only* the edits needed, as one or more blocks in this exact format:
+
+<<<<<<< SEARCH
+exact lines copied from the original code
+=======
+replacement lines
+>>>>>>> REPLACE
+
+Every SEARCH section must match the original code exactly, character for character, and must appear only once in it. Include enough surrounding lines to make it unique.
+List the blocks in the order they appear in the original code. Do not include any explanations, markdown formatting, headers, or any other extraneous text.
+If there are errors in the original code, indicate them with inline comments in the replacement lines, following this format: `error: [Specific error message]`.
+
+If the code is already correct and well-formatted, return only NO_CHANGES. If the code cannot be parsed as valid {language}, return "Language not supported."
+"""
+
+refactor_patch_prompt_user = """
+Refactor the following code written in {language}.
+
+Problem statement:
+
+{problem_description}
+
+```
+{code}
+```
+
+This was the output of the {language} code:
+
+{output}
+
+*INSTRUCTIONS*
+
+Do *not* return the whole file. Return *only* the edits needed, as one or more blocks in this exact format:
+
+<<<<<<< SEARCH
+exact lines copied from the original code
+=======
+replacement lines
+>>>>>>> REPLACE
+
+Every SEARCH section must match the original code exactly, character for character, and must appear only once in it. Include enough surrounding lines to make it unique.
+List the blocks in the order they appear in the original code. Do not include any explanations, markdown formatting, headers, or any other extraneous text.
+If there are errors in the original code, indicate them with inline comments in the replacement lines, following this format: `error: [Specific error message]`.
+
+If the code is already correct and well-formatted, return only NO_CHANGES. If the code cannot be parsed as valid {language}, return "Language not supported."
+"""
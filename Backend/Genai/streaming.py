@@ -0,0 +1,571 @@
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from flask import Response, jsonify, request, stream_with_context
+from dotenv import load_dotenv
+from deadline import (
+    DEADLINE_FIRST_CHUNK,
+    DEADLINE_REDIS,
+    DeadlineExceeded,
+    current_deadline,
+)
+
+load_dotenv()
+
+STREAM_BUFFER_BACKEND = os.getenv("STREAM_BUFFER_BACKEND", "memory").lower()
+STREAM_BUFFER_MAX_STREAMS = int(os.getenv("STREAM_BUFFER_MAX_STREAMS", "1000"))
+STREAM_BUFFER_MAX_EVENTS = int(os.getenv("STREAM_BUFFER_MAX_EVENTS", "4096"))
+STREAM_BUFFER_TTL = int(os.getenv("STREAM_BUFFER_TTL", "300"))
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+STREAM_COALESCE_MIN_BYTES = int(os.getenv("STREAM_COALESCE_MIN_BYTES", "512"))
+STREAM_COALESCE_MAX_HOLD = float(os.getenv("STREAM_COALESCE_MAX_HOLD", "0.05"))
+STREAM_COALESCE_MAX_PENDING = int(os.getenv("STREAM_COALESCE_MAX_PENDING", "64"))
+STREAM_RESUME_GRACE = float(os.getenv("STREAM_RESUME_GRACE", "30"))
+
+SSE_MIMETYPE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+logger = logging.getLogger("streaming")
+
+
+_DONE = object()
+
+
+class StreamGone(Exception):
+    pass
+
+
+class StreamSlice:
+    def __init__(self, events, done, error):
+        self.events = events
+        self.done = done
+        self.error = error
+
+
+class MemoryStreamBuffer:
+    def __init__(self, max_streams, max_events, ttl):
+        self.max_streams = max_streams
+        self.max_events = max_events
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.streams = OrderedDict()
+
+    def _evict(self):
+        now = time.monotonic()
+        for stream_id in list(self.streams):
+            if now - self.streams[stream_id]["updated"] > self.ttl:
+                del self.streams[stream_id]
+
+        while len(self.streams) >= self.max_streams:
+            self.streams.popitem(last=False)
+
+    def create(self, owner=None):
+        stream_id = uuid.uuid4().hex
+        with self.lock:
+            self._evict()
+            self.streams[stream_id] = {
+                "owner": owner,
+                "events": deque(maxlen=self.max_events),
+                "next": 0,
+                "done": False,
+                "error": None,
+                "updated": time.monotonic(),
+                "read_at": time.monotonic(),
+                "changed": threading.Condition(self.lock),
+            }
+        return stream_id
+
+    def append(self, stream_id, data):
+        with self.lock:
+            entry = self.streams.get(stream_id)
+            if entry is None:
+                return None
+
+            seq = entry["next"]
+            entry["events"].append((seq, data))
+            entry["next"] += 1
+            entry["updated"] = time.monotonic()
+            entry["changed"].notify_all()
+            return seq
+
+    def finish(self, stream_id, error=None):
+        with self.lock:
+            entry = self.streams.get(stream_id)
+            if entry is None:
+                return
+
+            entry["done"] = True
+            entry["error"] = error
+            entry["updated"] = time.monotonic()
+            entry["changed"].notify_all()
+
+    def read(self, stream_id, after, timeout=0):
+        with self.lock:
+            entry = self.streams.get(stream_id)
+            if entry is None:
+                return None
+
+            entry["read_at"] = time.monotonic()
+            if timeout and not entry["done"] and entry["next"] - 1 <= after:
+                entry["changed"].wait(timeout)
+
+            events = entry["events"]
+            first = events[0][0] if events else entry["next"]
+            if after + 1 < first:
+                raise StreamGone(stream_id)
+
+            return StreamSlice(
+                [event for event in events if event[0] > after],
+                entry["done"],
+                entry["error"],
+            )
+
+    def idle_for(self, stream_id):
+        with self.lock:
+            entry = self.streams.get(stream_id)
+            if entry is None:
+                return None
+            return time.monotonic() - entry["read_at"]
+
+    def owned_by(self, stream_id, owner):
+        with self.lock:
+            entry = self.streams.get(stream_id)
+            return owner is not None and entry is not None and entry["owner"] == owner
+
+
+class RedisStreamBuffer:
+    APPEND_SCRIPT = """
+    if redis.call('EXISTS', KEYS[2]) == 0 then
+        return false
+    end
+    local seq = redis.call('HINCRBY', KEYS[2], 'next', 1) - 1
+    redis.call('RPUSH', KEYS[1], cjson.encode({seq, ARGV[1]}))
+    redis.call('LTRIM', KEYS[1], -tonumber(ARGV[2]), -1)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+    return seq
+    """
+
+    READ_SCRIPT = """
+    local next = redis.call('HGET', KEYS[2], 'next')
+    if not next then
+        return false
+    end
+    redis.call('HSET', KEYS[2], 'read_at', ARGV[2])
+    local first = tonumber(next) - redis.call('LLEN', KEYS[1])
+    local start = math.max(tonumber(ARGV[1]) + 1 - first, 0)
+    local meta = redis.call('HMGET', KEYS[2], 'done', 'error')
+    return {first, meta[1], meta[2], redis.call('LRANGE', KEYS[1], start, -1)}
+    """
+
+    def __init__(self, max_events, ttl, poll_interval=0.1):
+        import redis
+
+        self.max_events = max_events
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.client = redis.StrictRedis(
+            host=os.getenv("REDIS_HOST"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            password=os.getenv("REDIS_PASSWORD"),
+            ssl=True,
+            socket_timeout=DEADLINE_REDIS,
+            socket_connect_timeout=DEADLINE_REDIS,
+        )
+        self.append_script = self.client.register_script(self.APPEND_SCRIPT)
+        self.read_script = self.client.register_script(self.READ_SCRIPT)
+
+    def _keys(self, stream_id):
+        return f"sse:{stream_id}:events", f"sse:{stream_id}:meta"
+
+    def create(self, owner=None):
+        stream_id = uuid.uuid4().hex
+        _, meta_key = self._keys(stream_id)
+        pipe = self.client.pipeline()
+        pipe.hset(
+            meta_key,
+            mapping={
+                "owner": owner or "",
+                "next": 0,
+                "done": 0,
+                "error": "",
+                "read_at": time.time(),
+            },
+        )
+        pipe.expire(meta_key, self.ttl)
+        pipe.execute()
+        return stream_id
+
+    def append(self, stream_id, data):
+        return self.append_script(
+            keys=self._keys(stream_id), args=[data, self.max_events, self.ttl]
+        )
+
+    def finish(self, stream_id, error=None):
+        events_key, meta_key = self._keys(stream_id)
+        pipe = self.client.pipeline()
+        pipe.hset(meta_key, mapping={"done": 1, "error": error or ""})
+        pipe.expire(events_key, self.ttl)
+        pipe.expire(meta_key, self.ttl)
+        pipe.execute()
+
+    def read(self, stream_id, after, timeout=0):
+        keys = self._keys(stream_id)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            result = self.read_script(keys=keys, args=[after, time.time()])
+            if result is None:
+                return None
+
+            first, done, error, raw_events = result
+            if after + 1 < first:
+                raise StreamGone(stream_id)
+
+            events = [tuple(json.loads(raw)) for raw in raw_events]
+            done = done == b"1"
+            if events or done or time.monotonic() >= deadline:
+                error = (error or b"").decode("utf-8") or None
+                return StreamSlice(events, done, error)
+
+            time.sleep(self.poll_interval)
+
+    def idle_for(self, stream_id):
+        _, meta_key = self._keys(stream_id)
+        read_at = self.client.hget(meta_key, "read_at")
+        if read_at is None:
+            return None
+        return time.time() - float(read_at)
+
+    def owned_by(self, stream_id, owner):
+        if owner is None:
+            return False
+        _, meta_key = self._keys(stream_id)
+        return self.client.hget(meta_key, "owner") == str(owner).encode("utf-8")
+
+
+def create_stream_buffer():
+    if STREAM_BUFFER_BACKEND == "redis":
+        logger.info("Using Redis stream buffer for resumable streams.")
+        return RedisStreamBuffer(STREAM_BUFFER_MAX_EVENTS, STREAM_BUFFER_TTL)
+
+    return MemoryStreamBuffer(
+        STREAM_BUFFER_MAX_STREAMS, STREAM_BUFFER_MAX_EVENTS, STREAM_BUFFER_TTL
+    )
+
+
+stream_buffer = create_stream_buffer()
+
+
+def wants_sse():
+    return (
+        request.accept_mimetypes.best_match(["text/plain", SSE_MIMETYPE])
+        == SSE_MIMETYPE
+    )
+
+
+def format_event(data, event_id=None, event=None):
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    for line in re.split(r"\r\n|\r|\n", data):
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+def current_user_id():
+    user = getattr(request, "user", None)
+    return user.get("userId") if user else None
+
+
+def parse_last_event_id(stream_id, last_event_id):
+    if not last_event_id:
+        return -1
+
+    event_stream_id, _, seq = last_event_id.rpartition(":")
+    if event_stream_id != stream_id or not seq.isdigit():
+        raise ValueError(f"Invalid Last-Event-ID: {last_event_id}")
+
+    return int(seq)
+
+
+stats_lock = threading.Lock()
+stream_stats = {
+    "started": 0,
+    "completed": 0,
+    "failed": 0,
+    "abandoned": 0,
+    "abandoned_tokens": 0,
+    "deadline_exceeded": 0,
+    "truncated": 0,
+}
+
+
+def record_stream(outcome, tokens=0):
+    with stats_lock:
+        stream_stats[outcome] += 1
+        if outcome == "abandoned":
+            stream_stats["abandoned_tokens"] += tokens
+
+
+def stream_stats_snapshot():
+    with stats_lock:
+        return dict(stream_stats)
+
+
+def close_iterator(iterator):
+    close = getattr(iterator, "close", None)
+    if close:
+        close()
+
+
+def track(chunks, source):
+    record_stream("started")
+
+    try:
+        for chunk in chunks:
+            yield chunk
+    except GeneratorExit:
+        tokens = getattr(source, "tokens", 0)
+        logger.info("Stream abandoned after %s tokens", tokens)
+        record_stream("abandoned", tokens)
+        raise
+    except DeadlineExceeded:
+        record_stream("deadline_exceeded")
+        raise
+    except Exception:
+        record_stream("failed")
+        raise
+    else:
+        record_stream("completed")
+    finally:
+        close_iterator(chunks)
+
+
+def report_deadline(chunks):
+    try:
+        yield from chunks
+    except DeadlineExceeded as e:
+        logger.warning("%s", e)
+        yield f"\n\n[{e}]"
+
+
+def within_deadline(chunks, deadline):
+    stage = "first_chunk"
+
+    try:
+        for chunk in chunks:
+            if deadline.expired():
+                raise DeadlineExceeded(stage)
+            stage = "total_stream"
+            yield chunk
+    finally:
+        close_iterator(chunks)
+
+
+def coalesce(
+    chunks,
+    deadline=None,
+    min_bytes=STREAM_COALESCE_MIN_BYTES,
+    max_hold=STREAM_COALESCE_MAX_HOLD,
+    max_pending=STREAM_COALESCE_MAX_PENDING,
+):
+    pending = queue.Queue(maxsize=max_pending)
+    cancelled = threading.Event()
+
+    def offer(item):
+        while not cancelled.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pump():
+        try:
+            for chunk in chunks:
+                if not offer(chunk):
+                    break
+        except Exception as e:
+            offer(e)
+        finally:
+            close_iterator(chunks)
+            offer(_DONE)
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(pump,), daemon=True).start()
+
+    first = True
+    held, held_bytes, held_since = [], 0, 0
+
+    try:
+        while True:
+            timeout, stage = None, None
+            if held:
+                timeout = max(0, held_since + max_hold - time.monotonic())
+
+            if deadline:
+                remaining = deadline.remaining()
+                if first:
+                    remaining = min(remaining, DEADLINE_FIRST_CHUNK)
+                if timeout is None or remaining < timeout:
+                    timeout = max(0, remaining)
+                    stage = "first_chunk" if first else "total_stream"
+
+            try:
+                item = pending.get(timeout=timeout)
+            except queue.Empty:
+                if held:
+                    yield "".join(held)
+                    held, held_bytes = [], 0
+                if stage:
+                    raise DeadlineExceeded(stage)
+                continue
+
+            if item is _DONE:
+                break
+
+            if isinstance(item, Exception):
+                if held:
+                    yield "".join(held)
+                raise item
+
+            if deadline and deadline.expired():
+                if held:
+                    yield "".join(held)
+                raise DeadlineExceeded("first_chunk" if first else "total_stream")
+
+            if first:
+                first = False
+                yield item
+                continue
+
+            if not held:
+                held_since = time.monotonic()
+            held.append(item)
+            held_bytes += len(item.encode("utf-8"))
+
+            if held_bytes >= min_bytes:
+                yield "".join(held)
+                held, held_bytes = [], 0
+
+        if held:
+            yield "".join(held)
+    finally:
+        cancelled.set()
+
+
+def produce(stream_id, chunks):
+    checked_at = time.monotonic()
+
+    try:
+        for chunk in chunks:
+            if stream_buffer.append(stream_id, chunk) is None:
+                logger.warning("Stream %s was evicted, abandoning it", stream_id)
+                close_iterator(chunks)
+                return
+
+            if time.monotonic() - checked_at < 1:
+                continue
+            checked_at = time.monotonic()
+
+            idle = stream_buffer.idle_for(stream_id)
+            if idle is not None and idle > STREAM_RESUME_GRACE:
+                logger.info("No reader for stream %s, abandoning it", stream_id)
+                close_iterator(chunks)
+                stream_buffer.finish(stream_id, error="Stream abandoned.")
+                return
+
+        stream_buffer.finish(stream_id)
+    except Exception as e:
+        logger.error("Error while producing stream %s: %s", stream_id, e, exc_info=True)
+        stream_buffer.finish(stream_id, error=str(e))
+
+
+def replay(stream_id, after):
+    while True:
+        try:
+            chunk_slice = stream_buffer.read(stream_id, after, timeout=SSE_KEEPALIVE)
+        except StreamGone:
+            yield format_event("Stream can no longer be resumed.", event="error")
+            return
+
+        if chunk_slice is None:
+            yield format_event("Stream not found.", event="error")
+            return
+
+        for seq, data in chunk_slice.events:
+            after = seq
+            yield format_event(data, event_id=f"{stream_id}:{seq}")
+
+        if chunk_slice.done and not chunk_slice.events:
+            if chunk_slice.error:
+                yield format_event(chunk_slice.error, event="error")
+            yield format_event("", event="end")
+            return
+
+        if not chunk_slice.events:
+            yield ": keepalive\n\n"
+
+
+def sse_response(stream_id, after):
+    headers = dict(SSE_HEADERS, **{"X-Stream-ID": stream_id})
+    return Response(replay(stream_id, after), mimetype=SSE_MIMETYPE, headers=headers)
+
+
+def stream_response(chunks, mimetype="text/plain", coalesce_chunks=True):
+    deadline = current_deadline()
+    source = chunks
+
+    if coalesce_chunks and STREAM_COALESCE_MIN_BYTES:
+        chunks = coalesce(chunks, deadline)
+    elif deadline:
+        chunks = within_deadline(chunks, deadline)
+
+    chunks = track(chunks, source)
+
+    if not wants_sse():
+        return Response(stream_with_context(report_deadline(chunks)), mimetype=mimetype)
+
+    if deadline:
+        deadline.budget("redis")
+    stream_id = stream_buffer.create(current_user_id())
+    logger.info("Started resumable stream: %s", stream_id)
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run, args=(produce, stream_id, chunks), daemon=True
+    ).start()
+    return sse_response(stream_id, -1)
+
+
+def resume_response(stream_id, last_event_id, owner):
+    if not stream_buffer.owned_by(stream_id, owner):
+        logger.info("Stream not found for resume: %s", stream_id)
+        return jsonify({"error": "Stream not found"}), 404
+
+    try:
+        after = parse_last_event_id(stream_id, last_event_id)
+        chunk_slice = stream_buffer.read(stream_id, after)
+    except ValueError as e:
+        logger.warning("%s", e)
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+    except StreamGone:
+        logger.warning("Resume window exceeded for stream: %s", stream_id)
+        return jsonify({"error": "Stream can no longer be resumed"}), 410
+
+    if chunk_slice is None:
+        logger.info("Stream not found for resume: %s", stream_id)
+        return jsonify({"error": "Stream not found"}), 404
+
+    logger.info("Resuming stream %s after event %s", stream_id, after)
+    return sse_response(stream_id, after)
@@ -0,0 +1,63 @@
+import os
+import sys
+import jwt
+import pytest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 52)
+os.environ.setdefault("GEMINI_MODEL", "test-model")
+os.environ.setdefault("GEMINI_MODEL_1", "test-model")
+os.environ.setdefault("PROMPT_CACHE_WARM_FILE", "")
+
+
+@pytest.fixture
+def genai_app(monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "is_human", lambda token: True)
+    app.prompt_cache.entries.clear()
+    return app
+
+
+@pytest.fixture
+def client(genai_app):
+    return genai_app.app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode({"userId": "user"}, os.environ["JWT_SECRET"], "HS512")
+    return {"Authorization": f"Bearer {token}", "X-Recaptcha-Token": "token"}
+
+
+@pytest.fixture
+def fake_model(genai_app, monkeypatch):
+    fake = SimpleNamespace(chunks=[], configs=[], sent=0, closed=False)
+
+    def generate_content_stream(model, contents, config):
+        fake.configs.append(config)
+        try:
+            for text in fake.chunks:
+                fake.sent += 1
+                yield SimpleNamespace(text=text, usage_metadata=None)
+        finally:
+            fake.closed = True
+
+    def generate_content(model, contents, config):
+        fake.configs.append(config)
+        return SimpleNamespace(text="".join(fake.chunks))
+
+    models = SimpleNamespace(
+        generate_content_stream=generate_content_stream,
+        generate_content=generate_content,
+    )
+
+    def model_client(deadline):
+        if deadline:
+            deadline.budget("upstream_connect")
+        return SimpleNamespace(models=models)
+
+    monkeypatch.setattr(genai_app, "model_client", model_client)
+    return fake
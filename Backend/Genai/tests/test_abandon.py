@@ -0,0 +1,57 @@
+import time
+import utils
+import streaming
+
+
+def slow_chunks(count):
+    for _ in range(count):
+        time.sleep(0.01)
+        yield "x" * 1024
+
+
+def test_client_disconnect_closes_model_stream(client, auth_headers, fake_model):
+    fake_model.chunks = slow_chunks(50)
+    before = streaming.stream_stats_snapshot()
+
+    response = client.post(
+        "/get-output",
+        json={"code": "print(1)", "language": "python"},
+        headers=auth_headers,
+        buffered=False,
+    )
+    body = iter(response.response)
+    next(body)
+    response.close()
+
+    for _ in range(100):
+        if fake_model.closed:
+            break
+        time.sleep(0.01)
+
+    after = streaming.stream_stats_snapshot()
+    assert fake_model.closed
+    assert fake_model.sent < 50
+    assert after["abandoned"] == before["abandoned"] + 1
+    assert after["completed"] == before["completed"]
+
+
+def test_stream_stats_need_the_admin_token(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(utils, "ADMIN_TOKEN", "admin")
+
+    assert client.get("/stats/streams").status_code == 403
+    assert client.get("/stats/streams", headers=auth_headers).status_code == 403
+    assert (
+        client.get("/stats/streams", headers={"X-Admin-Token": "wrong"}).status_code
+        == 403
+    )
+
+    response = client.get("/stats/streams", headers={"X-Admin-Token": "admin"})
+    assert response.status_code == 200
+    assert set(response.json) >= {"started", "completed", "abandoned"}
+
+
+def test_stream_stats_are_disabled_without_an_admin_token(client, monkeypatch):
+    monkeypatch.setattr(utils, "ADMIN_TOKEN", None)
+
+    response = client.get("/stats/streams", headers={"X-Admin-Token": ""})
+    assert response.status_code == 403
@@ -0,0 +1,85 @@
+import pytest
+from code_store import (
+    BaseMissing,
+    DeltaError,
+    MemoryCodeStore,
+    apply_delta,
+    code_hash,
+    code_store,
+    resolve_code,
+)
+from utils import MAX_SIZE
+
+BASE = "def add(a, b):\n    return a + b\n"
+
+
+def test_apply_delta_copies_skips_and_inserts():
+    delta = [4, "sum", -3, 19, "a + b + 0\n", -6]
+
+    assert apply_delta(BASE, delta) == "def sum(a, b):\n    return a + b + 0\n"
+
+
+@pytest.mark.parametrize("delta", [[len(BASE) + 1], [-len(BASE) - 1], [0], [True], "x"])
+def test_apply_delta_rejects_invalid_operations(delta):
+    with pytest.raises(DeltaError):
+        apply_delta(BASE, delta)
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryCodeStore(max_bytes=10, ttl=60)
+    first, second = store.put("aaaa"), store.put("bbbb")
+    store.get(first)
+    store.put("cccc")
+
+    assert store.get(first) == "aaaa"
+    assert store.get(second) is None
+
+
+def test_resolve_code_requires_a_matching_hash():
+    base_hash = code_store.put(BASE)
+    code = BASE + "print(add(1, 2))\n"
+    payload = {"base_hash": base_hash, "delta": [len(BASE), "print(add(1, 2))\n"]}
+
+    with pytest.raises(DeltaError):
+        resolve_code(payload)
+    with pytest.raises(BaseMissing):
+        resolve_code(dict(payload, code_hash=code_hash(BASE)))
+    assert resolve_code(dict(payload, code_hash=code_hash(code))) == code
+
+
+def test_resolve_code_reports_unknown_bases():
+    with pytest.raises(BaseMissing):
+        resolve_code({"base_hash": "0" * 64, "delta": [], "code_hash": "0" * 64})
+
+
+def test_oversized_code_is_not_stored(client):
+    code = "x" * (MAX_SIZE + 1)
+
+    response = client.post(
+        "/get-output",
+        json={"code": code, "language": "python"},
+        headers={"X-Recaptcha-Token": "token"},
+    )
+
+    assert response.status_code == 413
+    assert code_store.get(code_hash(code)) is None
+
+
+def test_delta_upload_returns_code_hash(client, fake_model):
+    fake_model.chunks = ["3"]
+    base_hash = code_store.put(BASE)
+    code = BASE + "print(add(1, 2))\n"
+
+    response = client.post(
+        "/get-output",
+        json={
+            "base_hash": base_hash,
+            "delta": [len(BASE), "print(add(1, 2))\n"],
+            "code_hash": code_hash(code),
+            "language": "python",
+        },
+        headers={"X-Recaptcha-Token": "token"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Code-Hash"] == code_hash(code)
@@ -0,0 +1,75 @@
+import gzip
+import zlib
+import brotli
+import pytest
+from flask import Flask, Response, jsonify
+from compression import COMPRESS_MIN_SIZE, compress_response
+
+app = Flask(__name__)
+app.after_request(compress_response)
+
+
+@app.route("/json/<int:size>")
+def json_view(size):
+    return jsonify({"data": "x" * size})
+
+
+@app.route("/stream")
+def stream_view():
+    return Response((f"line {i}\n" for i in range(100)), mimetype="text/plain")
+
+
+@app.route("/image")
+def image_view():
+    return Response(b"\x89PNG" * 1000, mimetype="image/png")
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)]
+)
+def test_large_json_is_compressed(client, encoding, decompress):
+    response = client.get(
+        f"/json/{COMPRESS_MIN_SIZE * 4}", headers={"Accept-Encoding": encoding}
+    )
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decompress(response.get_data()) == b'{"data":"%s"}\n' % (
+        b"x" * (COMPRESS_MIN_SIZE * 4)
+    )
+
+
+def test_brotli_is_preferred(client):
+    response = client.get(
+        f"/json/{COMPRESS_MIN_SIZE * 4}", headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_small_and_binary_responses_are_left_alone(client):
+    headers = {"Accept-Encoding": "gzip"}
+
+    assert "Content-Encoding" not in client.get("/json/10", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/image", headers=headers).headers
+    assert (
+        "Content-Encoding" not in client.get(f"/json/{COMPRESS_MIN_SIZE * 4}").headers
+    )
+
+
+def test_streams_are_flushed_per_chunk(client):
+    response = client.get(
+        "/stream", headers={"Accept-Encoding": "gzip"}, buffered=False
+    )
+    pieces = list(response.response)
+    decompressor = zlib.decompressobj(31)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert decompressor.decompress(pieces[0]) == b"line 0\n"
+    assert decompressor.decompress(b"".join(pieces[1:])) == b"".join(
+        f"line {i}\n".encode() for i in range(1, 100)
+    )
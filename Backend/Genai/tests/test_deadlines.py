@@ -0,0 +1,38 @@
+import time
+
+
+def test_spent_budget_is_a_504_before_streaming(client, auth_headers, fake_model):
+    fake_model.chunks = ["never sent"]
+
+    response = client.post(
+        "/generate_code",
+        json={"problem_description": "add", "language": "python"},
+        headers=dict(auth_headers, **{"X-Request-Timeout": "0"}),
+    )
+
+    assert response.status_code == 504
+    assert response.json == {"error": "Deadline exceeded", "stage": "upstream_connect"}
+    assert fake_model.sent == 0
+
+
+def test_deadline_during_stream_ends_with_marker(
+    client, auth_headers, fake_model, monkeypatch
+):
+    def slow_chunks():
+        yield "first"
+        time.sleep(0.3)
+        yield "late"
+
+    fake_model.chunks = slow_chunks()
+
+    response = client.post(
+        "/generate_code",
+        json={"problem_description": "add", "language": "python"},
+        headers=dict(auth_headers, **{"X-Request-Timeout": "0.1"}),
+    )
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert body.startswith("first")
+    assert "late" not in body
+    assert body.endswith("[Deadline exceeded at stage: total_stream]")
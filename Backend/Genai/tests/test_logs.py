@@ -0,0 +1,47 @@
+import sys
+import json
+import queue
+import logging
+from logs import DroppingQueueHandler, JsonFormatter
+
+
+def make_handler(size=10):
+    handler = DroppingQueueHandler(queue.Queue(size))
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def test_records_are_formatted_before_enqueue():
+    handler = make_handler()
+    logger = logging.getLogger("test_logs")
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logger.makeRecord(
+            logger.name,
+            logging.ERROR,
+            __file__,
+            1,
+            "failed: %s",
+            ("x",),
+            sys.exc_info(),
+        )
+    handler.handle(record)
+
+    queued = handler.queue.get_nowait()
+    entry = json.loads(queued.getMessage())
+    assert entry["message"] == "failed: x"
+    assert "ValueError: boom" in entry["exc_info"]
+    assert queued.args is None
+    assert queued.exc_info is None
+
+
+def test_full_queue_drops_records():
+    handler = make_handler(size=1)
+    record = logging.makeLogRecord({"msg": "hello", "levelno": logging.INFO})
+
+    handler.handle(record)
+    handler.handle(record)
+
+    assert handler.dropped == 1
@@ -0,0 +1,35 @@
+from limits import OUTPUT_LIMITS
+
+
+def test_streaming_improve_prompt_honours_output_cap(client, auth_headers, fake_model):
+    max_tokens, max_bytes = OUTPUT_LIMITS["/improve-prompt"]
+    fake_model.chunks = ['{"prompt_1": "'] + ["x" * 1024] * (max_bytes // 256)
+
+    response = client.post(
+        "/improve-prompt",
+        json={"topic": "sorting", "language": "python", "stream": True},
+        headers=auth_headers,
+    )
+    body = response.get_data()
+
+    assert response.status_code == 200
+    assert fake_model.configs[0].max_output_tokens == max_tokens
+    assert fake_model.sent <= max_bytes // 1024 + 1
+    assert fake_model.closed
+    assert len(body) < max_bytes
+
+
+def test_streaming_output_is_truncated_with_marker(client, auth_headers, fake_model):
+    max_tokens, max_bytes = OUTPUT_LIMITS["/get-output"]
+    fake_model.chunks = ["y" * 1024] * (max_bytes // 256)
+
+    response = client.post(
+        "/get-output",
+        json={"code": "print(1)", "language": "python"},
+        headers=auth_headers,
+    )
+    body = response.get_data(as_text=True)
+
+    assert fake_model.configs[0].max_output_tokens == max_tokens
+    assert body.endswith("[Output truncated]")
+    assert len(body.encode("utf-8")) <= max_bytes + len("\n\n[Output truncated]")
@@ -0,0 +1,54 @@
+import pytest
+from patching import (
+    PatchError,
+    apply_edit_blocks,
+    edit_list,
+    parse_edit_blocks,
+    unified_diff,
+)
+
+CODE = "a = 1\nb = 2\nprint(a + b)\n"
+
+
+def test_edit_blocks_apply_in_order():
+    blocks = parse_edit_blocks(
+        "<<<<<<< SEARCH\nb = 2\n=======\nb = 3\n>>>>>>> REPLACE\n"
+        "<<<<<<< SEARCH\nprint(a + b)\n=======\nprint(a * b)\n>>>>>>> REPLACE\n"
+    )
+
+    assert apply_edit_blocks(CODE, blocks) == "a = 1\nb = 3\nprint(a * b)\n"
+
+
+def test_no_changes_marker_yields_no_blocks():
+    assert parse_edit_blocks("```\nNO_CHANGES\n```") == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "just prose",
+        "<<<<<<< SEARCH\nb = 2\n=======\nb = 3\n",
+    ],
+)
+def test_malformed_edit_blocks_are_rejected(text):
+    with pytest.raises(PatchError):
+        parse_edit_blocks(text)
+
+
+def test_ambiguous_search_is_rejected():
+    with pytest.raises(PatchError):
+        apply_edit_blocks("x\nx\n", [("x\n", "y\n")])
+
+
+def test_missing_trailing_newline_is_preserved():
+    assert apply_edit_blocks("a\nb", [("b\n", "c\n")]) == "a\nc"
+
+
+def test_diff_and_edit_list_describe_the_change():
+    refactored = CODE.replace("b = 2", "b = 3")
+
+    diff = "".join(unified_diff(CODE, refactored))
+    assert "-b = 2\n+b = 3\n" in diff
+    assert edit_list(CODE, refactored) == [
+        {"op": "replace", "start_line": 2, "delete_count": 1, "insert": "b = 3\n"}
+    ]
@@ -0,0 +1,90 @@
+import json
+import pytest
+from prompt_parser import PromptParseError, PromptStreamParser, parse_prompts
+from utils import validate_json
+
+RESPONSE = '```json\n{"prompt_1": "Build a \\"todo\\" app", \'prompt_2\': "caf\\u00e9\\nmenu"}\n```'
+
+
+def feed_in_pieces(text, size):
+    parser = PromptStreamParser()
+    pairs = []
+    for start in range(0, len(text), size):
+        pairs.extend(parser.feed(text[start : start + size]))
+    return parser, pairs
+
+
+def test_parse_prompts_handles_fences_quotes_and_escapes():
+    assert parse_prompts(RESPONSE) == {
+        "prompt_1": 'Build a "todo" app',
+        "prompt_2": "café\nmenu",
+    }
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_streamed_pieces_parse_like_the_whole_text(size):
+    parser, pairs = feed_in_pieces(RESPONSE, size)
+
+    assert parser.done
+    assert dict(pairs) == parse_prompts(RESPONSE)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"prompt_1": "a"',
+        '{"prompt_1": 3}',
+        '{"prompt_1": "a" "prompt_2": "b"}',
+        '{"title": "a"}',
+        '{"prompt_1": "   "}',
+        "{}",
+        "no json here",
+    ],
+)
+def test_invalid_prompt_sets_are_rejected(text):
+    with pytest.raises(PromptParseError):
+        parse_prompts(text)
+    assert validate_json(text) == (False, None)
+
+
+def stream_prompts(client, auth_headers, topic):
+    response = client.post(
+        "/improve-prompt",
+        json={"topic": topic, "language": "python", "stream": True},
+        headers=auth_headers,
+    )
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_caches_only_sets_the_buffered_path_accepts(
+    genai_app, client, auth_headers, fake_model
+):
+    fake_model.chunks = ['{"prompt_1": "a", ', '"title": "b"}']
+
+    lines = stream_prompts(client, auth_headers, "invalid")
+
+    assert lines[-1] == {"error": "Invalid prompt format"}
+    assert genai_app.prompt_cache.get("python", "invalid") is None
+
+
+def test_stream_reports_truncated_sets_as_errors(
+    genai_app, client, auth_headers, fake_model
+):
+    fake_model.chunks = ['{"prompt_1": "a", ', '"prompt_2": "b']
+
+    lines = stream_prompts(client, auth_headers, "truncated")
+
+    assert lines == [{"prompt_1": "a"}, {"error": "Invalid prompt format"}]
+    assert genai_app.prompt_cache.get("python", "truncated") is None
+
+
+def test_stream_caches_complete_sets(genai_app, client, auth_headers, fake_model):
+    fake_model.chunks = ['{"prompt_1": "a", ', '"prompt_2": "b"}']
+
+    lines = stream_prompts(client, auth_headers, "complete")
+
+    assert lines == [{"prompt_1": "a"}, {"prompt_2": "b"}]
+    assert genai_app.prompt_cache.get("python", "complete") == {
+        "prompt_1": "a",
+        "prompt_2": "b",
+    }
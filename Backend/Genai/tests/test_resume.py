@@ -0,0 +1,165 @@
+import os
+import jwt
+import redis
+import pytest
+import fakeredis
+import streaming
+from streaming import (
+    MemoryStreamBuffer,
+    RedisStreamBuffer,
+    StreamGone,
+    format_event,
+    parse_last_event_id,
+)
+
+SSE = {"Accept": "text/event-stream"}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def buffer(request, monkeypatch):
+    if request.param == "redis":
+        monkeypatch.setattr(
+            redis, "StrictRedis", lambda **kwargs: fakeredis.FakeStrictRedis()
+        )
+        buffer = RedisStreamBuffer(4, 300, poll_interval=0.01)
+    else:
+        buffer = MemoryStreamBuffer(10, 4, 300)
+    monkeypatch.setattr(streaming, "stream_buffer", buffer)
+    return buffer
+
+
+def events(body):
+    return [
+        block.splitlines() for block in body.split("\n\n") if block and block[0] != ":"
+    ]
+
+
+def test_buffer_reads_after_sequence(buffer):
+    stream_id = buffer.create()
+    for data in "abc":
+        buffer.append(stream_id, data)
+    buffer.finish(stream_id)
+
+    chunk_slice = buffer.read(stream_id, 0)
+    assert chunk_slice.events == [(1, "b"), (2, "c")]
+    assert chunk_slice.done and chunk_slice.error is None
+    assert buffer.read("missing", -1) is None
+
+
+def test_buffer_refuses_trimmed_events(buffer):
+    stream_id = buffer.create()
+    for data in "abcdef":
+        buffer.append(stream_id, data)
+
+    assert [seq for seq, _ in buffer.read(stream_id, 1).events] == [2, 3, 4, 5]
+    with pytest.raises(StreamGone):
+        buffer.read(stream_id, 0)
+
+
+def test_last_event_id_must_match_stream():
+    assert parse_last_event_id("abc", None) == -1
+    assert parse_last_event_id("abc", "abc:4") == 4
+    for last_event_id in ("other:4", "abc:x", "4"):
+        with pytest.raises(ValueError):
+            parse_last_event_id("abc", last_event_id)
+
+
+def test_multiline_data_is_split_into_data_lines():
+    assert format_event("a\nb", event_id="s:0") == "id: s:0\ndata: a\ndata: b\n\n"
+
+
+def start_stream(client, headers, path="/generate_code", **payload):
+    response = client.post(
+        path,
+        json=payload or {"problem_description": "add", "language": "python"},
+        headers=dict(headers, **SSE),
+    )
+    return response.headers["X-Stream-ID"], response.get_data(as_text=True)
+
+
+def test_sse_stream_can_be_resumed(client, auth_headers, fake_model, buffer):
+    fake_model.chunks = ["first", "second"]
+
+    stream_id, body = start_stream(client, auth_headers)
+    received = events(body)
+
+    assert received[0] == [f"id: {stream_id}:0", "data: first"]
+    assert received[-1] == ["event: end", "data: "]
+
+    resumed = client.get(
+        f"/stream/{stream_id}",
+        headers=dict(auth_headers, **{"Last-Event-ID": f"{stream_id}:0"}),
+    )
+    assert resumed.status_code == 200
+    assert events(resumed.get_data(as_text=True))[0][1] == "data: second"
+
+
+def test_resume_needs_a_token(client, auth_headers, fake_model, buffer):
+    fake_model.chunks = ["secret"]
+    stream_id, _ = start_stream(client, auth_headers)
+
+    assert client.get(f"/stream/{stream_id}").status_code == 403
+
+
+def test_only_the_owner_can_resume(client, auth_headers, fake_model, buffer):
+    fake_model.chunks = ["secret"]
+    stream_id, _ = start_stream(client, auth_headers)
+    token = jwt.encode({"userId": "other"}, os.environ["JWT_SECRET"], "HS512")
+
+    response = client.get(
+        f"/stream/{stream_id}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 404
+
+
+def test_anonymous_streams_cannot_be_resumed(client, auth_headers, fake_model, buffer):
+    fake_model.chunks = ["output"]
+    stream_id, _ = start_stream(
+        client, {}, "/get-output", code="print(1)", language="python"
+    )
+
+    assert client.get(f"/stream/{stream_id}", headers=auth_headers).status_code == 404
+
+
+def test_resume_errors(client, auth_headers, buffer):
+    stream_id = buffer.create("user")
+
+    response = client.get(
+        f"/stream/{stream_id}", headers=dict(auth_headers, **{"Last-Event-ID": "x:1"})
+    )
+    assert response.status_code == 400
+    assert client.get("/stream/missing", headers=auth_headers).status_code == 404
+
+
+def test_resume_after_trimmed_events_is_gone(client, auth_headers, buffer):
+    stream_id = buffer.create("user")
+    for data in "abcdef":
+        buffer.append(stream_id, data)
+
+    response = client.get(
+        f"/stream/{stream_id}?lastEventId={stream_id}:0", headers=auth_headers
+    )
+    assert response.status_code == 410
+
+
+def test_producer_stops_when_its_stream_is_evicted(buffer):
+    pulled = []
+
+    def chunks():
+        try:
+            for i in range(100):
+                pulled.append(i)
+                yield "x"
+        finally:
+            pulled.append("closed")
+
+    stream_id = buffer.create("user")
+    if isinstance(buffer, MemoryStreamBuffer):
+        buffer.streams.clear()
+    else:
+        buffer.client.flushall()
+
+    streaming.produce(stream_id, chunks())
+
+    assert pulled == [0, "closed"]
+    assert buffer.read(stream_id, -1) is None
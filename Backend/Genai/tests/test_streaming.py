@@ -0,0 +1,128 @@
+import time
+import threading
+import pytest
+from flask import Flask, g
+from deadline import Deadline, DeadlineExceeded, current_deadline
+from streaming import coalesce, stream_response, within_deadline
+
+app = Flask(__name__)
+
+
+def test_uncoalesced_stream_runs_on_request_thread():
+    seen = []
+
+    def chunks():
+        seen.append((threading.current_thread(), current_deadline()))
+        yield "a"
+        yield "b"
+
+    with app.test_request_context("/"):
+        g.deadline = Deadline(30)
+        response = stream_response(chunks(), coalesce_chunks=False)
+        body = "".join(response.response)
+        deadline = g.deadline
+
+    assert body == "ab"
+    assert seen == [(threading.current_thread(), deadline)]
+
+
+def test_coalesce_pump_sees_request_context():
+    seen = []
+
+    def chunks():
+        seen.append(current_deadline())
+        yield "a"
+
+    with app.test_request_context("/"):
+        g.deadline = Deadline(30)
+        assert list(coalesce(chunks(), g.deadline, min_bytes=1)) == ["a"]
+        assert seen == [g.deadline]
+
+
+def test_within_deadline_stops_between_chunks():
+    def chunks():
+        yield "a"
+        time.sleep(0.05)
+        yield "b"
+
+    stream = within_deadline(chunks(), Deadline(0.01))
+    assert next(stream) == "a"
+    with pytest.raises(DeadlineExceeded) as e:
+        next(stream)
+    assert e.value.stage == "total_stream"
+
+
+def test_coalesce_sends_first_chunk_then_batches():
+    chunks = ["a", "bb", "cc", "dd", "e"]
+
+    assert list(coalesce(iter(chunks), min_bytes=4, max_hold=10)) == [
+        "a",
+        "bbcc",
+        "dde",
+    ]
+
+
+def test_coalesce_flushes_held_chunks_after_max_hold():
+    def chunks():
+        yield "a"
+        yield "b"
+        time.sleep(0.1)
+        yield "c"
+
+    assert list(coalesce(chunks(), min_bytes=100, max_hold=0.02)) == ["a", "b", "c"]
+
+
+def test_coalesce_flushes_before_raising():
+    def chunks():
+        yield "a"
+        yield "b"
+        raise RuntimeError("model failed")
+
+    stream = coalesce(chunks(), min_bytes=100, max_hold=10)
+    assert next(stream) == "a"
+    assert next(stream) == "b"
+    with pytest.raises(RuntimeError, match="model failed"):
+        next(stream)
+
+
+def test_coalesce_enforces_first_chunk_deadline():
+    def chunks():
+        time.sleep(0.2)
+        yield "late"
+
+    stream = coalesce(chunks(), Deadline(0.02), min_bytes=1)
+    with pytest.raises(DeadlineExceeded) as e:
+        next(stream)
+    assert e.value.stage == "first_chunk"
+
+
+def test_coalesce_enforces_deadline_on_slow_consumer():
+    stream = coalesce(iter(["x"] * 200), Deadline(0.2), min_bytes=1)
+    received = []
+
+    with pytest.raises(DeadlineExceeded) as e:
+        for chunk in stream:
+            received.append(chunk)
+            time.sleep(0.02)
+
+    assert e.value.stage == "total_stream"
+    assert len(received) < 200
+
+
+def test_coalesce_pump_waits_for_slow_consumer():
+    pulled = []
+
+    def chunks():
+        for i in range(100):
+            pulled.append(i)
+            yield "x"
+
+    stream = coalesce(chunks(), min_bytes=1, max_pending=4)
+    next(stream)
+    time.sleep(0.1)
+
+    assert len(pulled) <= 6
+    stream.close()
+
+    time.sleep(0.2)
+    assert len(pulled) <= 6
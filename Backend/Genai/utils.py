@@ -1,7 +1,5 @@
-import json
-import re
 import os
-import ast
+import hmac
 import requests
 import jwt
 import logging
@@ -9,15 +7,16 @@ from datetime import datetime, timezone
 from functools import wraps
 from flask import request, jsonify
 from dotenv import load_dotenv
+from prompt_parser import PromptParseError, parse_prompts
+from deadline import DEADLINE_CAPTCHA, DeadlineExceeded, current_deadline
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(module)s - %(message)s"
-)
+logger = logging.getLogger("utils")
 
 CODE_REGEX = r"```(?:\w+\n)?(.*?)```"
 SECRET_KEY = os.getenv("JWT_SECRET")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
 MAX_SIZE = int(0.5 * 1024 * 1024)
 
@@ -52,59 +51,52 @@ def utc_time_reference():
 
 
 def validate_json(gemini_output):
-    gemini_output = gemini_output.strip()
-    if gemini_output.startswith("```json"):
-        gemini_output = gemini_output[7:-3].strip()
-    elif gemini_output.startswith("```"):
-        gemini_output = gemini_output[3:-3].strip()
-
     try:
-        data = json.loads(gemini_output)
-    except json.JSONDecodeError:
-        logging.warning("JSON decoding failed, attempting ast.literal_eval.")
-        try:
-            data = ast.literal_eval(gemini_output)
-        except Exception as e:
-            logging.error(f"ast.literal_eval also failed: {e}")
-            return False, None
-
-    for key, value in data.items():
-        if not re.match(r"^prompt_\d+$", key):
-            logging.warning(f"Invalid key format in JSON data: '{key}'")
-            return False, None
-        if not isinstance(value, str) or not value.strip():
-            logging.warning(f"Invalid value for key '{key}': not a non-empty string.")
-            return False, None
-
-    logging.info("Successfully validated JSON data.")
+        data = parse_prompts(gemini_output)
+    except PromptParseError as e:
+        logger.error("Prompt JSON parsing failed: %s", e)
+        return False, None
+
+    logger.info("Successfully validated JSON data.")
     return True, data
 
 
 def is_human(recaptcha_token):
     if not recaptcha_token or not RECAPTCHA_SECRET_KEY:
-        logging.warning("reCAPTCHA check failed: Token or secret key is missing.")
+        logger.warning("reCAPTCHA check failed: Token or secret key is missing.")
         return False
 
     payload = {"secret": RECAPTCHA_SECRET_KEY, "response": recaptcha_token}
 
+    deadline = current_deadline()
+    timeout = deadline.budget("captcha", DEADLINE_CAPTCHA) if deadline else 50
+
     try:
         response = requests.post(
-            "https://www.google.com/recaptcha/api/siteverify", data=payload, timeout=50
+            "https://www.google.com/recaptcha/api/siteverify",
+            data=payload,
+            timeout=timeout,
         )
         response.raise_for_status()
         result = response.json()
 
         if result.get("success") and result.get("score", 0) > 0.5:
-            logging.info(
-                f"reCAPTCHA verification successful. Score: {result.get('score')}"
+            logger.info(
+                "reCAPTCHA verification successful. Score: %s", result.get("score")
             )
             return True
         else:
-            logging.warning(f"reCAPTCHA verification failed. Result: {result}")
+            logger.warning("reCAPTCHA verification failed. Result: %s", result)
             return False
 
+    except requests.exceptions.Timeout as e:
+        if deadline:
+            raise DeadlineExceeded("captcha") from e
+        logger.error("reCAPTCHA request to Google timed out: %s", e, exc_info=True)
+        return False
+
     except requests.exceptions.RequestException as e:
-        logging.error(f"reCAPTCHA request to Google failed: {e}")
+        logger.error("reCAPTCHA request to Google failed: %s", e, exc_info=True)
         return False
 
 
@@ -118,17 +110,33 @@ def token_required(f):
                 token = auth_header.split(" ")[1]
 
         if not token:
-            logging.warning("Access attempt without a token.")
+            logger.warning("Access attempt without a token.")
             return jsonify({"message": "Token is missing!"}), 403
 
         try:
             decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS512"])
             request.user = decoded
-            logging.info("Token successfully decoded.")
+            logger.info("Token successfully decoded.")
         except jwt.InvalidTokenError as e:
-            logging.warning(f"Invalid token received: {e}")
+            logger.warning("Invalid token received: %s", e)
             return jsonify({"message": "Invalid token!"}), 401
 
         return f(*args, **kwargs)
 
     return decorator
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorator(*args, **kwargs):
+        token = request.headers.get("X-Admin-Token", "")
+
+        if not ADMIN_TOKEN or not hmac.compare_digest(
+            token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")
+        ):
+            logger.warning("Rejected admin request to %s", request.path)
+            return jsonify({"message": "Admin token is missing or invalid!"}), 403
+
+        return f(*args, **kwargs)
+
+    return decorator
@@ -0,0 +1,91 @@
+import os
+import json
+import logging
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from app import request_improved_prompts
+from prompts import improve_prompts
+from prompt_cache import PROMPT_CACHE_WARM_FILE, normalize_topic
+
+logger = logging.getLogger("warmup")
+
+POPULAR_TOPICS = [
+    "todo app",
+    "calculator",
+    "snake game",
+    "tic tac toe",
+    "weather app",
+    "quiz app",
+    "number guessing game",
+    "stopwatch",
+    "bank account system",
+    "student management system",
+]
+
+
+def load_topics(path, top):
+    if not path:
+        return {language: POPULAR_TOPICS[:top] for language in improve_prompts}
+
+    with open(path, encoding="utf-8") as topics_file:
+        topics = json.load(topics_file)
+
+    if isinstance(topics, list):
+        return {language: topics[:top] for language in improve_prompts}
+
+    return {
+        language: topics.get(language, topics.get("*", POPULAR_TOPICS))[:top]
+        for language in improve_prompts
+    }
+
+
+def warm_topic(language, topic):
+    try:
+        prompt_template = improve_prompts[language].format(topic=topic)
+        return language, topic, request_improved_prompts(prompt_template)
+    except Exception as e:
+        logger.error("Warmup failed for %s / %s: %s", language, topic, e, exc_info=True)
+        return language, topic, None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute improved prompts for popular topics."
+    )
+    parser.add_argument("--topics", help="JSON list, or map of language to topics")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", default=PROMPT_CACHE_WARM_FILE)
+    args = parser.parse_args()
+
+    topics = load_topics(args.topics, args.top)
+    jobs = [
+        (language, normalize_topic(topic))
+        for language, language_topics in topics.items()
+        for topic in language_topics
+    ]
+
+    warm_set = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "prompts": {},
+    }
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for language, topic, prompts in executor.map(
+            lambda job: warm_topic(*job), jobs
+        ):
+            if prompts:
+                warm_set["prompts"].setdefault(language, {})[topic] = prompts
+
+    tmp_path = f"{args.output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as warm_file:
+        json.dump(warm_set, warm_file)
+    os.replace(tmp_path, args.output)
+
+    warmed = sum(len(entries) for entries in warm_set["prompts"].values())
+    logger.info("Wrote %s of %s warm prompt sets to %s", warmed, len(jobs), args.output)
+
+
+if __name__ == "__main__":
+    main()
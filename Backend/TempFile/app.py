@@ -1,5 +1,6 @@
 from flask import (
     Flask,
+    Response,
     abort,
     request,
     jsonify,
@@ -8,48 +9,90 @@ from flask import (
     url_for,
 )
 from flask_cors import CORS
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import uuid
-import json
 import redis
 from utils import *
+from store import BUNDLE_LANGUAGE, DELETED, ShareStore
+from codec import STORAGE_CHUNK_SIZE
+from tiering import create_disk_tier
+from near_cache import NEAR_CACHE_MAX_BYTES, NearCache
+from http_cache import add_cache_headers, matching_etag, not_modified
+from compression import compress_response
+from logs import configure_logging
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+configure_logging()
+
+logger = logging.getLogger("app")
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["Content-Range"])
+
+app.after_request(compress_response)
 
 TEMP_FILE_URL = os.getenv("TEMP_FILE_URL")
+MAX_METADATA_BATCH = int(os.getenv("MAX_METADATA_BATCH", "100"))
+MAX_BUNDLE_FILES = int(os.getenv("MAX_BUNDLE_FILES", "20"))
+MAX_BUNDLE_BYTES = int(os.getenv("MAX_BUNDLE_BYTES", str(2 * 1024 * 1024)))
+MAX_LIST_LIMIT = int(os.getenv("MAX_LIST_LIMIT", "100"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
+
+VALID_EXPIRY_TIMES = (10, 30, 60, 1440, 10080)
+
+disk_store, tiering_policy = create_disk_tier()
+share_store = ShareStore(redis_client, disk_store, tiering_policy)
+near_cache = NearCache(redis_client, NEAR_CACHE_MAX_BYTES)
 
 
 @app.route("/", methods=["GET"])
 def index():
-    logging.info("Serving index page.")
+    logger.info("Serving index page.")
     return render_template("index.html")
 
 
+@app.route("/stats/redis", methods=["GET"])
+@admin_required
+def redis_stats_api():
+    return jsonify(redis_pool_stats())
+
+
+@app.route("/stats/storage", methods=["GET"])
+@admin_required
+def storage_stats_api():
+    return jsonify(share_store.stats())
+
+
+@app.route("/stats/capacity", methods=["GET"])
+@admin_required
+def capacity_stats_api():
+    return jsonify(share_store.capacity())
+
+
+@app.route("/stats/near-cache", methods=["GET"])
+@admin_required
+def near_cache_stats_api():
+    return jsonify(near_cache.stats())
+
+
 @app.route("/temp-file-upload", methods=["POST"])
 @token_required
 def upload_file():
-    logging.info("Received request to /temp-file-upload")
+    logger.info("Received request to /temp-file-upload")
     token = request.headers.get("X-Recaptcha-Token")
 
     if not is_human(token):
-        logging.warning("reCAPTCHA verification failed for upload request.")
+        logger.warning("reCAPTCHA verification failed for upload request.")
         abort(403, description="reCAPTCHA verification failed.")
 
-    redis_client = get_redis_connection()
-    if not redis_client:
-        logging.error("Could not connect to Redis.")
-        return jsonify({"error": "Failed to connect to Redis"}), 503
-
     try:
         data = request.get_json()
 
@@ -60,7 +103,7 @@ def upload_file():
             or not data.get("title")
             or not data.get("expiryTime")
         ):
-            logging.warning("Upload request missing required fields.")
+            logger.warning("Upload request missing required fields.")
             return (
                 jsonify(
                     {"error": "Code, language, title, and expiry time are required"}
@@ -68,11 +111,10 @@ def upload_file():
                 400,
             )
 
-        valid_expiry_times = (10, 30, 60, 1440, 10080)
         expiry_time_minutes = int(data["expiryTime"])
 
-        if expiry_time_minutes not in valid_expiry_times:
-            logging.warning(f"Invalid expiry time received: {expiry_time_minutes}")
+        if expiry_time_minutes not in VALID_EXPIRY_TIMES:
+            logger.warning("Invalid expiry time received: %s", expiry_time_minutes)
             return (
                 jsonify({"error": "Invalid expiry time. Please choose a valid value."}),
                 400,
@@ -95,15 +137,16 @@ def upload_file():
             "expiry_time": formatted_expiry_time,
         }
 
-        redis_client.set(
-            f"file:{language}-{file_id}:data",
-            json.dumps(file_data),
-            ex=expiry_time_minutes * 60,
+        share_store.create(
+            f"{language}-{file_id}",
+            file_data,
+            expiry_time_minutes * 60,
+            request.user_data["userId"],
         )
 
         file_url = f"{TEMP_FILE_URL}/file/{language}-{file_id}"
 
-        logging.info(f"Successfully created file {language}-{file_id}")
+        logger.info("Successfully created file %s-%s", language, file_id)
 
         return jsonify(
             {
@@ -113,39 +156,250 @@ def upload_file():
             }
         )
 
+    except RequestEntityTooLarge:
+        logger.warning("File upload exceeds %s bytes", MAX_UPLOAD_BYTES)
+        return (
+            jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit"}),
+            413,
+        )
+
+    except redis.ConnectionError as e:
+        logger.error("Redis connection error during file upload: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
     except redis.RedisError as e:
-        logging.error(f"Redis error during file upload: {e}")
+        logger.error("Redis error during file upload: %s", e, exc_info=True)
         return jsonify({"error": "Failed to store code in Redis"}), 500
 
     except Exception as e:
-        logging.error(f"Unexpected error during file upload: {e}")
+        logger.error("Unexpected error during file upload: %s", e, exc_info=True)
         return jsonify({"error": "An unexpected error occurred"}), 500
 
-    finally:
-        redis_client.close()
 
+@app.route("/temp-file-upload/stream", methods=["POST"])
+@token_required
+def upload_file_stream():
+    logger.info("Received request to /temp-file-upload/stream")
+    token = request.headers.get("X-Recaptcha-Token")
 
-@app.route("/file/<shareId>", methods=["GET"])
-def get_file(shareId):
-    logging.info(f"Received request to get file: {shareId}")
-    redis_client = get_redis_connection()
-    if not redis_client:
-        logging.error("Could not connect to Redis.")
+    if not is_human(token):
+        logger.warning("reCAPTCHA verification failed for stream upload request.")
+        abort(403, description="reCAPTCHA verification failed.")
+
+    try:
+        language = request.args.get("language")
+        title = request.args.get("title")
+        expiry_time_minutes = request.args.get("expiryTime", type=int)
+
+        if not language or not title or not expiry_time_minutes:
+            logger.warning("Stream upload request missing required parameters.")
+            return (
+                jsonify({"error": "Language, title, and expiry time are required"}),
+                400,
+            )
+
+        if expiry_time_minutes not in VALID_EXPIRY_TIMES:
+            logger.warning("Invalid expiry time received: %s", expiry_time_minutes)
+            return (
+                jsonify({"error": "Invalid expiry time. Please choose a valid value."}),
+                400,
+            )
+
+        current_time = datetime.utcnow()
+        expiry_time = current_time + timedelta(minutes=expiry_time_minutes)
+        formatted_expiry_time = expiry_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+        share_id = f"{language}-{uuid.uuid4()}"
+        stream = request.stream
+
+        size = share_store.create_from_chunks(
+            share_id,
+            title,
+            language,
+            iter(lambda: stream.read(STORAGE_CHUNK_SIZE), b""),
+            expiry_time_minutes * 60,
+            request.user_data["userId"],
+        )
+
+        logger.info(
+            "Successfully created file %s from %s streamed bytes", share_id, size
+        )
+
+        return jsonify(
+            {
+                "message": "Code uploaded successfully",
+                "fileUrl": f"{TEMP_FILE_URL}/file/{share_id}",
+                "expiry_time": formatted_expiry_time,
+                "size": size,
+            }
+        )
+
+    except RequestEntityTooLarge:
+        logger.warning("Stream upload exceeds %s bytes", MAX_UPLOAD_BYTES)
+        return (
+            jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit"}),
+            413,
+        )
+
+    except UnicodeDecodeError:
+        logger.warning("Stream upload body is not valid UTF-8.")
+        return jsonify({"error": "Code must be UTF-8 text"}), 400
+
+    except ValueError:
+        logger.warning("Stream upload body is empty.")
+        return jsonify({"error": "Code is required"}), 400
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during stream upload: %s", e, exc_info=True
+        )
         return jsonify({"error": "Failed to connect to Redis"}), 503
 
+    except redis.RedisError as e:
+        logger.error("Redis error during stream upload: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to store code in Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error during stream upload: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@app.route("/temp-files-upload", methods=["POST"])
+@token_required
+def upload_files():
+    logger.info("Received request to /temp-files-upload")
+    token = request.headers.get("X-Recaptcha-Token")
+
+    if not is_human(token):
+        logger.warning("reCAPTCHA verification failed for bundle upload request.")
+        abort(403, description="reCAPTCHA verification failed.")
+
+    try:
+        data = request.get_json()
+
+        if (
+            not data
+            or not data.get("files")
+            or not data.get("title")
+            or not data.get("expiryTime")
+        ):
+            logger.warning("Bundle upload request missing required fields.")
+            return (
+                jsonify({"error": "Files, title, and expiry time are required"}),
+                400,
+            )
+
+        files = data["files"]
+
+        if not isinstance(files, list) or len(files) > MAX_BUNDLE_FILES:
+            logger.warning("Invalid file list in bundle upload request.")
+            return (
+                jsonify(
+                    {"error": f"Files must be a list of at most {MAX_BUNDLE_FILES}"}
+                ),
+                400,
+            )
+
+        for file in files:
+            if (
+                not isinstance(file, dict)
+                or not isinstance(file.get("name"), str)
+                or not isinstance(file.get("code"), str)
+                or not isinstance(file.get("language"), str)
+                or not file["name"]
+                or not file["code"]
+                or not file["language"]
+            ):
+                logger.warning("Bundle upload request has an invalid file entry.")
+                return (
+                    jsonify({"error": "Each file needs a name, language, and code"}),
+                    400,
+                )
+
+        if len({file["name"] for file in files}) != len(files):
+            logger.warning("Bundle upload request has duplicate file names.")
+            return jsonify({"error": "File names must be unique"}), 400
+
+        if sum(len(file["code"].encode("utf-8")) for file in files) > MAX_BUNDLE_BYTES:
+            logger.warning("Bundle upload exceeds maximum allowed size.")
+            return (
+                jsonify({"error": f"Bundle exceeds the {MAX_BUNDLE_BYTES} byte limit"}),
+                413,
+            )
+
+        expiry_time_minutes = int(data["expiryTime"])
+
+        if expiry_time_minutes not in VALID_EXPIRY_TIMES:
+            logger.warning("Invalid expiry time received: %s", expiry_time_minutes)
+            return (
+                jsonify({"error": "Invalid expiry time. Please choose a valid value."}),
+                400,
+            )
+
+        current_time = datetime.utcnow()
+        expiry_time = current_time + timedelta(minutes=expiry_time_minutes)
+        formatted_expiry_time = expiry_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+        share_id = f"{BUNDLE_LANGUAGE}-{uuid.uuid4()}"
+
+        share_store.create_bundle(
+            share_id,
+            data["title"],
+            files,
+            expiry_time_minutes * 60,
+            request.user_data["userId"],
+        )
+
+        logger.info(
+            "Successfully created bundle %s with %s files", share_id, len(files)
+        )
+
+        return jsonify(
+            {
+                "message": "Files uploaded successfully",
+                "fileUrl": f"{TEMP_FILE_URL}/file/{share_id}",
+                "expiry_time": formatted_expiry_time,
+            }
+        )
+
+    except RequestEntityTooLarge:
+        logger.warning("Bundle upload exceeds %s bytes", MAX_UPLOAD_BYTES)
+        return (
+            jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit"}),
+            413,
+        )
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during bundle upload: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error during bundle upload: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to store files in Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error during bundle upload: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@app.route("/file/<shareId>", methods=["GET"])
+def get_file(shareId):
+    logger.info("Received request to get file: %s", shareId)
     try:
         header_shareId = request.headers.get("X-File-ID")
 
         if not header_shareId or header_shareId != shareId:
-            logging.warning(
-                f"Redirecting unauthorized access attempt for file: {shareId}"
+            logger.warning(
+                "Redirecting unauthorized access attempt for file: %s", shareId
             )
             return redirect(url_for("index"))
 
         try:
             language, file_id = shareId.split("-", 1)
         except ValueError:
-            logging.warning(f"Invalid shareId format received: {shareId}")
+            logger.warning("Invalid shareId format received: %s", shareId)
             return (
                 jsonify(
                     {
@@ -155,74 +409,342 @@ def get_file(shareId):
                 400,
             )
 
-        file_key = f"file:{language}-{file_id}:data"
-        file_data = redis_client.get(file_key)
-        ttl = redis_client.ttl(file_key)
+        share_id = f"{language}-{file_id}"
+        file_key = f"file:{share_id}:data"
+
+        if request.if_none_match:
+            share = near_cache.peek(share_id) or share_store.metadata(share_id)
+            etag = matching_etag(share.etag) if share.ttl > 0 else None
+            if etag:
+                logger.info("File not modified: %s", file_key)
+                return not_modified(share, etag)
 
-        if ttl == -2:
-            logging.info(f"File not found for key: {file_key}")
+        share = near_cache.get(share_id, share_store.get)
+
+        if share.ttl == -2:
+            logger.info("File not found for key: %s", file_key)
             return jsonify({"error": "File not found"}), 404
-        elif ttl == -1 or ttl == 0:
-            logging.info(f"File has expired for key: {file_key}")
+        elif share.ttl == -1 or share.ttl == 0:
+            logger.info("File has expired for key: %s", file_key)
             return jsonify({"error": "File has expired"}), 410
 
-        if file_data:
-            logging.info(f"Successfully retrieved file: {file_key}")
-            file_data = json.loads(file_data)
-            return jsonify(file_data), 200
+        if share.data:
+            logger.info("Successfully retrieved file: %s", file_key)
+            return add_cache_headers(jsonify(share.data), share), 200
 
-        logging.warning(f"File data was None for key: {file_key}")
+        logger.warning("File data was None for key: %s", file_key)
         return jsonify({"error": "File not found"}), 404
 
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during file retrieval: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
     except redis.RedisError as e:
-        logging.error(f"Redis error during file retrieval: {e}")
+        logger.error("Redis error during file retrieval: %s", e, exc_info=True)
         return jsonify({"error": "Failed to retrieve code from Redis"}), 500
 
     except Exception as e:
-        logging.error(f"Unexpected error during file retrieval: {e}")
+        logger.error("Unexpected error during file retrieval: %s", e, exc_info=True)
         return jsonify({"error": "An unexpected error occurred"}), 500
 
-    finally:
-        redis_client.close()
+
+@app.route("/file/<shareId>/raw", methods=["GET"])
+def get_file_raw(shareId):
+    logger.info("Received request for raw file: %s", shareId)
+    try:
+        header_shareId = request.headers.get("X-File-ID")
+
+        if not header_shareId or header_shareId != shareId:
+            logger.warning("Redirecting unauthorized raw request for file: %s", shareId)
+            return redirect(url_for("index"))
+
+        share = share_store.metadata(shareId)
+
+        if share.ttl == -2:
+            logger.info("File not found for raw read: %s", shareId)
+            return jsonify({"error": "File not found"}), 404
+        elif share.ttl == -1 or share.ttl == 0:
+            logger.info("File has expired for raw read: %s", shareId)
+            return jsonify({"error": "File has expired"}), 410
+
+        if "files" in share.data:
+            logger.warning("Raw read requested for bundle: %s", shareId)
+            return jsonify({"error": "Bundles cannot be read as raw text"}), 400
+
+        etag = matching_etag(share.etag) if request.if_none_match else None
+        if etag:
+            logger.info("Raw file not modified: %s", shareId)
+            return not_modified(share, etag)
+
+        size = share.data.get("size")
+        byte_range = request.range
+
+        if (
+            byte_range
+            and len(byte_range.ranges) == 1
+            and size is not None
+            and (
+                "If-Range" not in request.headers or request.if_range.etag == share.etag
+            )
+        ):
+            bounds = byte_range.range_for_length(size)
+            if bounds is None:
+                logger.info("Unsatisfiable range for %s: %s", shareId, byte_range)
+                response = Response(status=416)
+                response.content_range = ContentRange("bytes", None, None, size)
+                return response
+
+            start, stop = bounds
+            data = share_store.read_range(shareId, start, stop)
+            if data is None:
+                logger.info("File disappeared during raw read: %s", shareId)
+                return jsonify({"error": "File not found"}), 404
+
+            response = Response(data, status=206, mimetype="text/plain")
+            response.content_range = ContentRange("bytes", start, stop, size)
+        else:
+            share = near_cache.get(shareId, share_store.get)
+            if not share.data:
+                logger.info("File not found for raw read: %s", shareId)
+                return jsonify({"error": "File not found"}), 404
+            response = Response(share.data["code"], mimetype="text/plain")
+
+        response.accept_ranges = "bytes"
+        logger.info("Successfully served raw file: %s", shareId)
+        return add_cache_headers(response, share)
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during raw file retrieval: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error during raw file retrieval: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to retrieve code from Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error during raw file retrieval: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@app.route("/file/<shareId>/meta", methods=["GET"])
+def get_file_metadata(shareId):
+    logger.info("Received request for file metadata: %s", shareId)
+    try:
+        header_shareId = request.headers.get("X-File-ID")
+
+        if not header_shareId or header_shareId != shareId:
+            logger.warning(
+                "Redirecting unauthorized metadata request for file: %s", shareId
+            )
+            return redirect(url_for("index"))
+
+        share = share_store.metadata(shareId)
+
+        if share.ttl == -2:
+            logger.info("File not found for metadata: %s", shareId)
+            return jsonify({"error": "File not found"}), 404
+        elif share.ttl == -1 or share.ttl == 0:
+            logger.info("File has expired for metadata: %s", shareId)
+            return jsonify({"error": "File has expired"}), 410
+
+        return jsonify(dict(share.data, ttl=share.ttl)), 200
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during metadata retrieval: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error during metadata retrieval: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to retrieve metadata from Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error during metadata retrieval: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@app.route("/files/meta", methods=["POST"])
+def get_files_metadata():
+    logger.info("Received request for bulk file metadata")
+    try:
+        data = request.get_json()
+        share_ids = data.get("shareIds") if data else None
+
+        if not isinstance(share_ids, list) or not all(
+            isinstance(share_id, str) for share_id in share_ids
+        ):
+            logger.warning("Bulk metadata request without a list of shareIds.")
+            return jsonify({"error": "shareIds must be a list of share IDs"}), 400
+
+        if len(share_ids) > MAX_METADATA_BATCH:
+            logger.warning("Bulk metadata request for %s shares", len(share_ids))
+            return (
+                jsonify(
+                    {"error": f"At most {MAX_METADATA_BATCH} shareIds per request"}
+                ),
+                400,
+            )
+
+        header_shareIds = {
+            share_id.strip()
+            for share_id in request.headers.get("X-File-ID", "").split(",")
+        }
+        allowed = [share_id for share_id in share_ids if share_id in header_shareIds]
+
+        if len(allowed) < len(share_ids):
+            logger.warning(
+                "Withholding metadata for %s share IDs missing from X-File-ID",
+                len(share_ids) - len(allowed),
+            )
+
+        files = dict.fromkeys(share_ids)
+        files.update(share_store.metadata_many(allowed))
+        return jsonify({"files": files}), 200
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during bulk metadata retrieval: %s",
+            e,
+            exc_info=True,
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error during bulk metadata retrieval: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to retrieve metadata from Redis"}), 500
+
+    except Exception as e:
+        logger.error(
+            "Unexpected error during bulk metadata retrieval: %s", e, exc_info=True
+        )
+        return jsonify({"error": "An unexpected error occurred"}), 500
 
 
 @app.route("/file/<file_id>/delete", methods=["DELETE"])
 @token_required
 def delete_file(file_id):
-    logging.info(f"Received request to delete file: {file_id}")
+    logger.info("Received request to delete file: %s", file_id)
     token = request.headers.get("X-Recaptcha-Token")
 
     if not is_human(token):
-        logging.warning("reCAPTCHA verification failed for delete request.")
+        logger.warning("reCAPTCHA verification failed for delete request.")
         abort(403, description="reCAPTCHA verification failed.")
 
-    redis_client = get_redis_connection()
-    if not redis_client:
-        logging.error("Could not connect to Redis.")
-        return jsonify({"error": "Failed to connect to Redis"}), 503
-
     try:
         language, file_id_part = file_id.split("-", 1)
         file_key = f"file:{language}-{file_id_part}:data"
 
-        if redis_client.exists(file_key):
-            redis_client.delete(file_key)
-            logging.info(f"Successfully deleted file: {file_key}")
+        near_cache.invalidate(f"{language}-{file_id_part}")
+        if share_store.delete(f"{language}-{file_id_part}") == DELETED:
+            logger.info("Successfully deleted file: %s", file_key)
             return jsonify({"message": "File deleted successfully"}), 200
         else:
-            logging.warning(f"Attempted to delete a non-existent file: {file_key}")
+            logger.warning("Attempted to delete a non-existent file: %s", file_key)
             return jsonify({"error": "File not found"}), 404
 
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during file deletion: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
     except redis.RedisError as e:
-        logging.error(f"Redis error during file deletion: {e}")
+        logger.error("Redis error during file deletion: %s", e, exc_info=True)
         return jsonify({"error": "Failed to delete file from Redis"}), 500
 
     except Exception as e:
-        logging.error(f"Unexpected error during file deletion: {e}")
+        logger.error("Unexpected error during file deletion: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@app.route("/user/shares", methods=["GET"])
+@token_required
+def list_user_shares():
+    logger.info("Received request to list user shares")
+    try:
+        offset = request.args.get("offset", 0, type=int)
+        limit = request.args.get("limit", 50, type=int)
+
+        if offset < 0 or not 0 < limit <= MAX_LIST_LIMIT:
+            logger.warning("Invalid pagination for user shares: %s/%s", offset, limit)
+            return (
+                jsonify({"error": f"offset must be >= 0 and limit 1-{MAX_LIST_LIMIT}"}),
+                400,
+            )
+
+        shares, total = share_store.list_user_shares(
+            request.user_data["userId"], offset, limit
+        )
+
+        next_offset = offset + limit if offset + limit < total else None
+        return (
+            jsonify(
+                {
+                    "shares": [
+                        dict(metadata, shareId=share_id)
+                        for share_id, metadata in shares.items()
+                        if metadata is not None
+                    ],
+                    "total": total,
+                    "nextOffset": next_offset,
+                }
+            ),
+            200,
+        )
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error while listing user shares: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error while listing user shares: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to list shares from Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error while listing user shares: %s", e, exc_info=True)
         return jsonify({"error": "An unexpected error occurred"}), 500
 
-    finally:
-        redis_client.close()
+
+@app.route("/user/shares", methods=["DELETE"])
+@token_required
+def delete_user_shares():
+    logger.info("Received request to delete all user shares")
+    token = request.headers.get("X-Recaptcha-Token")
+
+    if not is_human(token):
+        logger.warning("reCAPTCHA verification failed for bulk delete request.")
+        abort(403, description="reCAPTCHA verification failed.")
+
+    try:
+        deleted = share_store.delete_user_shares(request.user_data["userId"])
+        for share_id in deleted:
+            near_cache.invalidate(share_id)
+
+        logger.info("Deleted %s shares for user", len(deleted))
+        return jsonify(
+            {"message": "Shares deleted successfully", "deleted": len(deleted)}
+        )
+
+    except redis.ConnectionError as e:
+        logger.error(
+            "Redis connection error during bulk deletion: %s", e, exc_info=True
+        )
+        return jsonify({"error": "Failed to connect to Redis"}), 503
+
+    except redis.RedisError as e:
+        logger.error("Redis error during bulk deletion: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to delete shares from Redis"}), 500
+
+    except Exception as e:
+        logger.error("Unexpected error during bulk deletion: %s", e, exc_info=True)
+        return jsonify({"error": "An unexpected error occurred"}), 500
 
 
 if __name__ == "__main__":
@@ -0,0 +1,447 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import socket
+import logging
+import argparse
+import secrets
+import threading
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+import redis
+import requests
+
+TEMPFILE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_DIR = os.path.normpath(
+    os.path.join(TEMPFILE_DIR, "..", "..", "Frontend", "src", "samples")
+)
+
+SAMPLE_LANGUAGES = {"index": "html", "style": "css", "script": "javascript"}
+VALID_EXPIRY_TIMES = (10, 30, 60, 1440, 10080)
+OPERATIONS = ("upload", "get", "delete")
+PERCENTILES = (50, 90, 95, 99)
+
+logger = logging.getLogger("bench")
+
+
+class RecaptchaStub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"success": True, "score": 0.9}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(check, what, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return check()
+        except Exception as e:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{what} did not start: {e}")
+            time.sleep(0.1)
+
+
+def start_recaptcha_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecaptchaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/siteverify"
+
+
+def start_redis(port):
+    process = subprocess.Popen(
+        [
+            "redis-server",
+            "--port",
+            str(port),
+            "--bind",
+            "127.0.0.1",
+            "--save",
+            "",
+            "--appendonly",
+            "no",
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for(lambda: redis.Redis(port=port).ping(), "redis-server")
+    return process
+
+
+def start_app(port, redis_port, recaptcha_url, jwt_secret, admin_token, args):
+    env = dict(
+        os.environ,
+        REDIS_HOST="127.0.0.1",
+        REDIS_PORT=str(redis_port),
+        REDIS_PASSWORD="",
+        REDIS_SSL="false",
+        JWT_SECRET=jwt_secret,
+        ADMIN_TOKEN=admin_token,
+        RECAPTCHA_SECRET_KEY="bench",
+        RECAPTCHA_VERIFY_URL=recaptcha_url,
+        TEMP_FILE_URL=f"http://127.0.0.1:{port}",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(args.workers),
+    )
+    env.setdefault("LOG_LEVEL", "WARNING")
+
+    app_log = open(args.app_log, "ab") if args.app_log else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=TEMPFILE_DIR,
+        env=env,
+        stdout=app_log,
+        stderr=subprocess.STDOUT,
+    )
+    wait_for(
+        lambda: requests.get(
+            f"http://127.0.0.1:{port}/stats/redis",
+            headers={"X-Admin-Token": admin_token},
+            timeout=1,
+        ).raise_for_status(),
+        "TempFile",
+    )
+    return process
+
+
+def load_samples(samples_dir):
+    samples = []
+    for name in sorted(os.listdir(samples_dir)):
+        path = os.path.join(samples_dir, name)
+        if name.startswith(".") or not os.path.isfile(path):
+            continue
+
+        stem = os.path.splitext(name)[0]
+        with open(path, encoding="utf-8") as sample:
+            samples.append((SAMPLE_LANGUAGES.get(stem, stem), sample.read()))
+    return samples
+
+
+def parse_weights(spec, cast=str):
+    weights = {}
+    for item in spec.split(","):
+        key, _, weight = item.partition(":")
+        weights[cast(key)] = float(weight or 1)
+    return weights
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))]
+
+
+class Workload:
+    def __init__(self, base_url, token, samples, args):
+        self.base_url = base_url
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "X-Recaptcha-Token": "bench",
+        }
+        self.samples = samples
+        self.scales = parse_weights(args.scales, int)
+        self.mix = parse_weights(args.mix)
+        self.expiry = parse_weights(args.expiry, int)
+        self.duplicates = args.duplicates
+        self.lock = threading.Lock()
+        self.shares = []
+
+    def payload(self, rng):
+        language, code = rng.choice(self.samples)
+        code *= rng.choices(list(self.scales), list(self.scales.values()))[0]
+        if rng.random() >= self.duplicates:
+            code += f"\n{uuid.uuid4()}\n"
+        return language, code
+
+    def upload(self, session, rng):
+        language, code = self.payload(rng)
+        expiry = rng.choices(list(self.expiry), list(self.expiry.values()))[0]
+        response = session.post(
+            f"{self.base_url}/temp-file-upload",
+            json={
+                "title": "bench",
+                "code": code,
+                "language": language,
+                "expiryTime": expiry,
+            },
+            headers=self.headers,
+        )
+        if response.ok:
+            with self.lock:
+                self.shares.append(response.json()["fileUrl"].rsplit("/", 1)[1])
+        return response
+
+    def get(self, session, share_id):
+        return session.get(
+            f"{self.base_url}/file/{share_id}", headers={"X-File-ID": share_id}
+        )
+
+    def delete(self, session, share_id):
+        return session.delete(
+            f"{self.base_url}/file/{share_id}/delete", headers=self.headers
+        )
+
+    def pick(self, rng, remove):
+        with self.lock:
+            if not self.shares:
+                return None
+            index = rng.randrange(len(self.shares))
+            share_id = self.shares[index]
+            if remove:
+                self.shares[index] = self.shares[-1]
+                self.shares.pop()
+            return share_id
+
+    def run_operation(self, session, rng, operation):
+        share_id = None
+        if operation != "upload":
+            share_id = self.pick(rng, remove=operation == "delete")
+            if share_id is None:
+                operation = "upload"
+
+        started = time.perf_counter()
+        try:
+            if operation == "upload":
+                response = self.upload(session, rng)
+            else:
+                response = getattr(self, operation)(session, share_id)
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return operation, time.perf_counter() - started, status
+
+    def run_worker(self, seed, deadline, max_ops):
+        rng = random.Random(seed)
+        session = requests.Session()
+        operations = list(self.mix)
+        weights = list(self.mix.values())
+        results = []
+
+        while time.monotonic() < deadline and len(results) < max_ops:
+            operation = rng.choices(operations, weights)[0]
+            results.append(self.run_operation(session, rng, operation))
+        return results
+
+
+def summarize(results, elapsed):
+    summary = {
+        "operations": len(results),
+        "elapsed_seconds": elapsed,
+        "ops_per_second": len(results) / elapsed if elapsed else None,
+        "by_operation": {},
+    }
+
+    for operation in OPERATIONS:
+        latencies = sorted(
+            seconds * 1000 for name, seconds, _ in results if name == operation
+        )
+        if not latencies:
+            continue
+
+        errors = {}
+        for name, _, status in results:
+            if name == operation and not (isinstance(status, int) and status < 400):
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+        summary["by_operation"][operation] = {
+            "operations": len(latencies),
+            "errors": errors,
+            "ops_per_second": len(latencies) / elapsed if elapsed else None,
+            "latency_ms": dict(
+                {f"p{p}": percentile(latencies, p) for p in PERCENTILES},
+                mean=sum(latencies) / len(latencies),
+                max=latencies[-1],
+            ),
+        }
+    return summary
+
+
+def redis_memory(client):
+    try:
+        return client.info("memory").get("used_memory")
+    except redis.ResponseError as e:
+        logger.warning("Redis memory is unavailable: %s", e)
+        return None
+
+
+def count_shares(client):
+    return sum(1 for _ in client.scan_iter(match="file:*:data", count=1000))
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=TEMPFILE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    samples = load_samples(args.samples)
+    jwt_secret = secrets.token_hex(32)
+    admin_token = secrets.token_hex(32)
+    token = jwt.encode({"userId": "bench"}, jwt_secret, algorithm="HS512")
+
+    redis_port = args.redis_port or free_port()
+    app_port = free_port()
+    redis_process = None if args.redis_port else start_redis(redis_port)
+    recaptcha, recaptcha_url = start_recaptcha_stub()
+    app_process = None
+
+    try:
+        app_process = start_app(
+            app_port, redis_port, recaptcha_url, jwt_secret, admin_token, args
+        )
+        client = redis.Redis(port=redis_port)
+        base_url = f"http://127.0.0.1:{app_port}"
+        admin_headers = {"X-Admin-Token": admin_token}
+        workload = Workload(base_url, token, samples, args)
+
+        baseline_memory = redis_memory(client)
+        baseline_shares = count_shares(client)
+
+        logger.info("Preloading %s shares", args.preload)
+        session = requests.Session()
+        rng = random.Random(args.seed)
+        for _ in range(args.preload):
+            workload.upload(session, rng)
+
+        logger.info(
+            "Running %s for %ss with %s clients",
+            args.mix,
+            args.duration,
+            args.concurrency,
+        )
+        deadline = time.monotonic() + args.duration
+        max_ops = -(-args.ops // args.concurrency) if args.ops else float("inf")
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            batches = executor.map(
+                lambda seed: workload.run_worker(seed, deadline, max_ops),
+                range(args.seed + 1, args.seed + 1 + args.concurrency),
+            )
+            results = [result for batch in batches for result in batch]
+        elapsed = time.monotonic() - started
+
+        memory = redis_memory(client)
+        shares = count_shares(client) - baseline_shares
+
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "config": vars(args),
+            "results": summarize(results, elapsed),
+            "redis": {
+                "baseline_used_memory": baseline_memory,
+                "used_memory": memory,
+                "shares": shares,
+                "bytes_per_share": (
+                    (memory - baseline_memory) / shares
+                    if shares and memory is not None and baseline_memory is not None
+                    else None
+                ),
+            },
+            "storage": requests.get(
+                f"{base_url}/stats/storage", headers=admin_headers
+            ).json(),
+            "capacity": requests.get(
+                f"{base_url}/stats/capacity", headers=admin_headers
+            ).json(),
+        }
+
+    finally:
+        recaptcha.shutdown()
+        for process in (app_process, redis_process):
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark TempFile uploads, reads and deletes against a local Redis."
+    )
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--ops", type=int, default=0, help="stop after this many ops")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--preload", type=int, default=500)
+    parser.add_argument("--mix", default="get:80,upload:15,delete:5")
+    parser.add_argument(
+        "--scales",
+        default="1:70,4:20,32:10",
+        help="sample repeat factor:weight pairs for payload sizes",
+    )
+    parser.add_argument("--expiry", default="10:50,60:30,10080:20")
+    parser.add_argument(
+        "--duplicates",
+        type=float,
+        default=0.0,
+        help="fraction of uploads sent as exact sample copies",
+    )
+    parser.add_argument("--samples", default=SAMPLES_DIR)
+    parser.add_argument("--redis-port", type=int, help="use a running Redis")
+    parser.add_argument("--app-log", help="append TempFile output to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    for operation in parse_weights(args.mix):
+        if operation not in OPERATIONS:
+            parser.error(f"Unknown operation in --mix: {operation}")
+    for expiry in parse_weights(args.expiry, int):
+        if expiry not in VALID_EXPIRY_TIMES:
+            parser.error(f"Invalid expiry in --expiry: {expiry}")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    report = run(args)
+
+    output = args.output or datetime.now(timezone.utc).strftime(
+        "tempfile-bench-%Y%m%dT%H%M%SZ.json"
+    )
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    results = report["results"]
+    logger.info(
+        "%.1f ops/s over %s operations",
+        results["ops_per_second"] or 0,
+        results["operations"],
+    )
+    for operation, stats in results["by_operation"].items():
+        logger.info(
+            "%-6s %8.1f ops/s  p50 %.2fms  p99 %.2fms  errors %s",
+            operation,
+            stats["ops_per_second"],
+            stats["latency_ms"]["p50"],
+            stats["latency_ms"]["p99"],
+            sum(stats["errors"].values()),
+        )
+    logger.info("Redis bytes per share: %s", report["redis"]["bytes_per_share"])
+    logger.info("Wrote %s", output)
+
+
+if __name__ == "__main__":
+    main()
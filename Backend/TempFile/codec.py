@@ -0,0 +1,80 @@
+import os
+import zlib
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_CODEC = os.getenv("STORAGE_CODEC", "zlib").lower()
+STORAGE_COMPRESS_MIN_SIZE = int(os.getenv("STORAGE_COMPRESS_MIN_SIZE", "256"))
+STORAGE_COMPRESS_LEVEL = int(os.getenv("STORAGE_COMPRESS_LEVEL", "6"))
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(64 * 1024)))
+
+MAGIC = b"\xffTF"
+VERSION = 1
+RAW, ZLIB, ZSTD = 0, 1, 2
+HEADER_SIZE = len(MAGIC) + 2
+
+logger = logging.getLogger("codec")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CodecError(ValueError):
+    pass
+
+
+def configured_compression():
+    if STORAGE_CODEC == "none":
+        return RAW
+    if STORAGE_CODEC == "zstd":
+        if zstandard is not None:
+            return ZSTD
+        logger.warning("zstandard is not installed, falling back to zlib.")
+    return ZLIB
+
+
+COMPRESSION = configured_compression()
+
+
+def compress(data, compression):
+    if compression == ZSTD:
+        return zstandard.ZstdCompressor(level=STORAGE_COMPRESS_LEVEL).compress(data)
+    return zlib.compress(data, STORAGE_COMPRESS_LEVEL)
+
+
+def decompress(body, compression):
+    if compression == RAW:
+        return body
+    if compression == ZLIB:
+        return zlib.decompress(body)
+    if compression == ZSTD:
+        if zstandard is None:
+            raise CodecError("Value is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise CodecError(f"Unknown compression: {compression}")
+
+
+def encode(data):
+    compression, body = RAW, data
+
+    if COMPRESSION != RAW and len(data) >= STORAGE_COMPRESS_MIN_SIZE:
+        compressed = compress(data, COMPRESSION)
+        if len(compressed) < len(data):
+            compression, body = COMPRESSION, compressed
+
+    return MAGIC + bytes([VERSION, compression]) + body
+
+
+def decode(stored):
+    if not stored.startswith(MAGIC):
+        return stored
+
+    version, compression = stored[len(MAGIC)], stored[len(MAGIC) + 1]
+    if version != VERSION:
+        raise CodecError(f"Unsupported storage version: {version}")
+
+    return decompress(stored[HEADER_SIZE:], compression)
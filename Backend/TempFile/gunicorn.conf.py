@@ -0,0 +1,30 @@
+import os
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or "gthread"
+
+if worker_class == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+wsgi_app = "app:app"
+bind = os.getenv("GUNICORN_BIND") or "0.0.0.0:5000"
+workers = int(os.getenv("GUNICORN_WORKERS") or multiprocessing.cpu_count() * 2 + 1)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS") or 1000)
+threads = int(os.getenv("GUNICORN_THREADS") or 8)
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT") or 30)
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT") or 30)
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE") or 5)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS") or 2000)
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER") or 200)
+
+
+def post_fork(server, worker):
+    from logs import restart_logging
+
+    restart_logging()
@@ -0,0 +1,31 @@
+from flask import Response, request
+
+ENCODED_ETAG_SUFFIXES = ("br", "gzip")
+
+
+def matching_etag(etag):
+    if not etag:
+        return None
+
+    if request.if_none_match.star_tag:
+        return etag
+
+    variants = {etag} | {f"{etag}-{suffix}" for suffix in ENCODED_ETAG_SUFFIXES}
+    for tag in request.if_none_match.as_set(include_weak=True):
+        if tag in variants:
+            return tag
+    return None
+
+
+def add_cache_headers(response, share, etag=None):
+    if etag or share.etag:
+        response.set_etag(etag or share.etag)
+    response.headers["Cache-Control"] = f"public, max-age={max(share.ttl, 0)}"
+    response.vary.add("X-File-ID")
+    return response
+
+
+def not_modified(share, etag):
+    response = Response(status=304)
+    response.vary.add("Accept-Encoding")
+    return add_cache_headers(response, share, etag)
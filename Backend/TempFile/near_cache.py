@@ -0,0 +1,258 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+import redis
+from dotenv import load_dotenv
+from store import Share
+
+load_dotenv()
+
+NEAR_CACHE_MAX_BYTES = int(os.getenv("NEAR_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+NEAR_CACHE_CONFIGURE_NOTIFICATIONS = (
+    os.getenv("NEAR_CACHE_CONFIGURE_NOTIFICATIONS", "false").lower() == "true"
+)
+NEAR_CACHE_FALLBACK_TTL = float(os.getenv("NEAR_CACHE_FALLBACK_TTL", "5"))
+NEAR_CACHE_RECONNECT_DELAY = float(os.getenv("NEAR_CACHE_RECONNECT_DELAY", "1"))
+
+REQUIRED_NOTIFY_FLAGS = "Kgxeh"
+ALL_EVENTS_FLAG = "A"
+ALL_EVENTS_FLAGS = "g$lshzxetd"
+
+logger = logging.getLogger("near_cache")
+
+
+def entry_size(data):
+    return sum(len(str(value).encode("utf-8")) for value in data.values())
+
+
+def expand_notify_flags(flags):
+    return set(flags.replace(ALL_EVENTS_FLAG, ALL_EVENTS_FLAGS))
+
+
+class NearCache:
+    def __init__(self, redis_client, max_bytes):
+        self.client = redis_client
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.epoch = 0
+        self.loading = {}
+        self.connected = False
+        self.ttl_only = False
+        self.pid = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def ensure_listener(self):
+        if self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.connected = False
+            self.ttl_only = False
+            self.entries.clear()
+            self.loading.clear()
+            self.size = 0
+
+        threading.Thread(target=self.listen, daemon=True).start()
+
+    def notifications_enabled(self):
+        try:
+            current = expand_notify_flags(
+                self.client.config_get("notify-keyspace-events").get(
+                    "notify-keyspace-events", ""
+                )
+            )
+            if current >= set(REQUIRED_NOTIFY_FLAGS):
+                return True
+
+            if NEAR_CACHE_CONFIGURE_NOTIFICATIONS:
+                flags = "".join(sorted(current | set(REQUIRED_NOTIFY_FLAGS)))
+                self.client.config_set("notify-keyspace-events", flags)
+                return True
+
+            logger.warning(
+                "Keyspace notifications lack %s, near cache falls back to TTL-only",
+                REQUIRED_NOTIFY_FLAGS,
+            )
+        except redis.ResponseError as e:
+            logger.warning(
+                "Could not check keyspace notifications, near cache falls back "
+                "to TTL-only: %s",
+                e,
+            )
+        return False
+
+    def listen(self):
+        db = self.client.connection_pool.connection_kwargs.get("db", 0)
+        pattern = f"__keyspace@{db}__:file:*:data"
+        prefix = len(f"__keyspace@{db}__:file:")
+
+        while True:
+            pubsub = None
+            try:
+                if not self.notifications_enabled():
+                    with self.lock:
+                        self.ttl_only = True
+                    return
+
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(pattern)
+                with self.lock:
+                    self.connected = True
+                logger.info("Near cache subscribed to %s", pattern)
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "pmessage":
+                        self.invalidate(message["channel"][prefix:-5].decode("utf-8"))
+
+            except Exception as e:
+                logger.error(
+                    "Near cache invalidation listener failed: %s", e, exc_info=True
+                )
+
+            finally:
+                with self.lock:
+                    self.connected = False
+                    self.epoch += 1
+                    self.entries.clear()
+                    self.size = 0
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+            time.sleep(NEAR_CACHE_RECONNECT_DELAY)
+
+    def invalidate(self, share_id):
+        with self.lock:
+            if share_id in self.loading:
+                self.loading[share_id][0] += 1
+
+            entry = self.entries.pop(share_id, None)
+            if entry is not None:
+                self.size -= entry[3]
+                self.invalidations += 1
+
+    def usable(self):
+        return self.connected or self.ttl_only
+
+    def cached(self, share_id):
+        entry = self.entries.get(share_id)
+        if entry is None or not self.usable():
+            return None
+
+        data, etag, expires_at, size, fresh_until = entry
+        now = time.monotonic()
+        remaining = expires_at - now
+        if remaining < 1 or now >= fresh_until:
+            del self.entries[share_id]
+            self.size -= size
+            return None
+
+        self.entries.move_to_end(share_id)
+        self.hits += 1
+        return Share(data, int(remaining), etag)
+
+    def peek(self, share_id):
+        if not self.enabled():
+            return None
+
+        with self.lock:
+            return self.cached(share_id)
+
+    def lookup(self, share_id):
+        with self.lock:
+            share = self.cached(share_id)
+            if share is not None:
+                return share, None
+
+            self.misses += 1
+            loading = self.loading.setdefault(share_id, [0, 0])
+            loading[1] += 1
+            return None, (self.epoch, loading[0])
+
+    def finish_load(self, share_id, share, version):
+        size = entry_size(share.data) if share is not None and share.data else None
+
+        with self.lock:
+            loading = self.loading[share_id]
+            loading[1] -= 1
+            if loading[1] == 0:
+                del self.loading[share_id]
+
+            if (
+                size is None
+                or size > self.max_bytes
+                or share.ttl <= 0
+                or not self.usable()
+                or version != (self.epoch, loading[0])
+            ):
+                return
+
+            now = time.monotonic()
+            fresh_for = share.ttl if self.connected else NEAR_CACHE_FALLBACK_TTL
+
+            entry = self.entries.pop(share_id, None)
+            if entry is not None:
+                self.size -= entry[3]
+
+            self.entries[share_id] = (
+                share.data,
+                share.etag,
+                now + share.ttl,
+                size,
+                now + fresh_for,
+            )
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, _, _, evicted, _) = self.entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def get(self, share_id, load):
+        if not self.enabled():
+            return load(share_id)
+
+        self.ensure_listener()
+
+        share, version = self.lookup(share_id)
+        if share is not None:
+            return share
+
+        try:
+            share = load(share_id)
+        finally:
+            self.finish_load(share_id, share, version)
+        return share
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled(),
+                "connected": self.connected,
+                "ttl_only": self.ttl_only,
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
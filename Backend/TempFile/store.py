@@ -0,0 +1,849 @@
+import json
+import time
+import codecs
+import hashlib
+from contextlib import suppress
+from datetime import datetime, timezone
+from redis.cluster import RedisCluster
+from codec import STORAGE_CHUNK_SIZE, decode, encode
+from tiering import DISK_TIER, REDIS_TIER
+
+DELETED = 1
+NOT_FOUND = 0
+
+RECORD_VERSION = 1
+RECORD_FIELDS = {
+    "t": "title",
+    "l": "language",
+    "x": "expires_at",
+    "s": "size",
+    "b": "blob",
+    "f": "files",
+    "o": "owner",
+    "e": "expiry",
+    "d": "tier",
+}
+EXPIRY_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+STORAGE_STATS_KEY = "stats:storage"
+CAPACITY_STATS_KEY = "stats:capacity"
+CAPACITY_PENDING_KEY = "stats:capacity:pending"
+CAPACITY_SWEEP_BATCH = 1000
+STAGING_BATCH_CHUNKS = 16
+STAGING_TTL = 3600
+
+BUNDLE_LANGUAGE = "bundle"
+
+ADD_REF_LUA = """
+local function write_chunks(chunks)
+    return function(blob)
+        local stored = 0
+        for _, chunk in ipairs(chunks) do
+            if #chunks == 1 then
+                redis.call('SET', blob, chunk)
+            else
+                redis.call('RPUSH', blob, chunk)
+            end
+            stored = stored + string.len(chunk)
+        end
+        return stored
+    end
+end
+
+local function add_ref(blob, refs, stats, write, raw_size, share_id, expires_at, now)
+    redis.call('ZREMRANGEBYSCORE', refs, '-inf', now)
+    if redis.call('EXISTS', blob) == 0 then
+        local stored = write(blob)
+        redis.call('HINCRBY', stats, 'blobs_written', 1)
+        redis.call('HINCRBY', stats, 'raw_bytes', raw_size)
+        redis.call('HINCRBY', stats, 'stored_bytes', stored)
+    else
+        redis.call('HINCRBY', stats, 'dedup_hits', 1)
+        redis.call('HINCRBY', stats, 'dedup_bytes', raw_size)
+    end
+    redis.call('ZADD', refs, expires_at, share_id)
+    local latest = redis.call('ZRANGE', refs, -1, -1, 'WITHSCORES')
+    redis.call('EXPIREAT', blob, latest[2])
+    redis.call('EXPIREAT', refs, latest[2])
+end
+"""
+
+INDEX_SHARE_LUA = """
+local function index_share(index, share_id, expires_at, now)
+    redis.call('ZADD', index, expires_at, share_id)
+    redis.call('ZREMRANGEBYSCORE', index, '-inf', now)
+    local latest = redis.call('ZRANGE', index, -1, -1, 'WITHSCORES')
+    redis.call('EXPIREAT', index, latest[2])
+end
+"""
+
+CAPACITY_LUA = """
+local CAPACITY_WRITE_SWEEP = 2
+
+local function count_capacity(stats, language, expiry, size, sign)
+    for _, group in ipairs({'total', 'language:' .. language, 'expiry:' .. expiry}) do
+        redis.call('HINCRBY', stats, group .. ':shares', sign)
+        redis.call('HINCRBY', stats, group .. ':bytes', sign * size)
+    end
+end
+
+local function untrack_capacity(stats, pending, share_id, language, expiry, size)
+    local member = cjson.encode({share_id, language, expiry, size})
+    if redis.call('ZREM', pending, member) == 1 then
+        count_capacity(stats, language, expiry, tonumber(size), -1)
+    end
+end
+
+local function expire_capacity(stats, pending, now, limit)
+    local expired = redis.call('ZRANGEBYSCORE', pending, '-inf', now, 'LIMIT', 0, limit)
+    for _, member in ipairs(expired) do
+        local share = cjson.decode(member)
+        untrack_capacity(stats, pending, share[1], share[2], share[3], share[4])
+    end
+    return #expired
+end
+
+local function track_capacity(
+    stats, pending, share_id, language, expiry, size, expires_at, now
+)
+    expire_capacity(stats, pending, now, CAPACITY_WRITE_SWEEP)
+    local member = cjson.encode({share_id, language, expiry, size})
+    if redis.call('ZADD', pending, expires_at, member) == 1 then
+        count_capacity(stats, language, expiry, tonumber(size), 1)
+    end
+end
+"""
+
+SHARE_BLOBS_LUA = """
+local function share_blobs(key, kind)
+    if kind == 'hash' then
+        if redis.call('HGET', key, 'd') == 'disk' then
+            return {}
+        end
+        local files = redis.call('HGET', key, 'f')
+        if files then
+            local blobs = {}
+            for _, file in ipairs(cjson.decode(files)) do
+                table.insert(blobs, file['blob'])
+            end
+            return blobs
+        end
+        local blob = redis.call('HGET', key, 'b')
+        if blob then
+            return {blob}
+        end
+        return {}
+    end
+    local ok, data = pcall(cjson.decode, redis.call('GET', key))
+    if ok and type(data) == 'table' and (data['b'] or data['blob']) then
+        return {data['b'] or data['blob']}
+    end
+    return {}
+end
+"""
+
+STORE_SCRIPT = ADD_REF_LUA + INDEX_SHARE_LUA + CAPACITY_LUA + """
+local expiry = tostring(math.floor(tonumber(ARGV[6]) / 60))
+redis.call('DEL', KEYS[3])
+redis.call(
+    'HSET', KEYS[3],
+    't', ARGV[5], 'l', ARGV[8], 'x', ARGV[3],
+    's', ARGV[7], 'b', ARGV[1], 'o', ARGV[9], 'e', expiry
+)
+if ARGV[10] == 'disk' then
+    redis.call('HSET', KEYS[3], 'd', 'disk')
+    local stored = tonumber(ARGV[11])
+    if stored > 0 then
+        redis.call('HINCRBY', KEYS[4], 'blobs_written', 1)
+        redis.call('HINCRBY', KEYS[4], 'raw_bytes', ARGV[7])
+        redis.call('HINCRBY', KEYS[4], 'stored_bytes', stored)
+        redis.call('HINCRBY', KEYS[4], 'disk_bytes', stored)
+    else
+        redis.call('HINCRBY', KEYS[4], 'dedup_hits', 1)
+        redis.call('HINCRBY', KEYS[4], 'dedup_bytes', ARGV[7])
+    end
+else
+    local write
+    if KEYS[8] then
+        write = function(blob)
+            redis.call('RENAME', KEYS[8], blob)
+            return tonumber(ARGV[11])
+        end
+    else
+        local chunks = {}
+        for i = 11, #ARGV do
+            table.insert(chunks, ARGV[i])
+        end
+        write = write_chunks(chunks)
+    end
+    add_ref(KEYS[1], KEYS[2], KEYS[4], write, ARGV[7], ARGV[2], ARGV[3], ARGV[4])
+end
+if KEYS[8] then
+    redis.call('UNLINK', KEYS[8])
+end
+redis.call('EXPIRE', KEYS[3], ARGV[6])
+index_share(KEYS[5], ARGV[2], ARGV[3], ARGV[4])
+track_capacity(
+    KEYS[6], KEYS[7], ARGV[2], ARGV[8], expiry, ARGV[7], ARGV[3], ARGV[4]
+)
+return 1
+"""
+
+BUNDLE_STORE_SCRIPT = ADD_REF_LUA + INDEX_SHARE_LUA + CAPACITY_LUA + """
+local expiry = tostring(math.floor(tonumber(ARGV[4]) / 60))
+for i = 1, (#KEYS - 5) / 2 do
+    add_ref(
+        KEYS[4 + 2 * i], KEYS[5 + 2 * i], KEYS[2],
+        write_chunks({ARGV[8 + 2 * i]}), ARGV[9 + 2 * i], ARGV[1], ARGV[2], ARGV[3]
+    )
+end
+redis.call('DEL', KEYS[1])
+redis.call(
+    'HSET', KEYS[1],
+    't', ARGV[5], 'l', ARGV[8], 'x', ARGV[2],
+    's', ARGV[7], 'f', ARGV[6], 'o', ARGV[9], 'e', expiry
+)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+index_share(KEYS[3], ARGV[1], ARGV[2], ARGV[3])
+track_capacity(
+    KEYS[4], KEYS[5], ARGV[1], ARGV[8], expiry, ARGV[7], ARGV[2], ARGV[3]
+)
+return 1
+"""
+
+LOAD_SCRIPT = SHARE_BLOBS_LUA + """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'none' then
+    return {false, -2, {}}
+end
+local ttl = redis.call('TTL', KEYS[1])
+local record
+if kind == 'hash' then
+    record = redis.call('HGETALL', KEYS[1])
+else
+    record = redis.call('GET', KEYS[1])
+end
+local codes = {}
+for i, blob in ipairs(share_blobs(KEYS[1], kind)) do
+    local key = 'blob:' .. blob
+    if redis.call('TYPE', key)['ok'] == 'list' then
+        codes[i] = redis.call('LRANGE', key, 0, -1)
+    else
+        codes[i] = redis.call('GET', key)
+    end
+end
+return {record, ttl, codes}
+"""
+
+METADATA_SCRIPT = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'none' then
+    return {false, -2}
+end
+local ttl = redis.call('TTL', KEYS[1])
+if kind == 'hash' then
+    return {redis.call('HGETALL', KEYS[1]), ttl}
+end
+local ok, data = pcall(cjson.decode, redis.call('GET', KEYS[1]))
+if not ok or type(data) ~= 'table' then
+    return {false, -2}
+end
+if data['code'] then
+    data['size'] = string.len(data['code'])
+    data['code'] = nil
+end
+return {cjson.encode(data), ttl}
+"""
+
+RANGE_SCRIPT = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'none' then
+    return {false, 0, {}}
+end
+if kind ~= 'hash' then
+    return {redis.call('GET', KEYS[1]), 0, {}}
+end
+local blob = redis.call('HGET', KEYS[1], 'b')
+if not blob then
+    return {false, 0, {}}
+end
+if redis.call('HGET', KEYS[1], 'd') == 'disk' then
+    return {false, 0, {}, blob}
+end
+local key = 'blob:' .. blob
+local chunk_size = tonumber(string.match(blob, ':(%d+)$'))
+if not chunk_size then
+    return {false, 0, {redis.call('GET', key)}}
+end
+local first = math.floor(tonumber(ARGV[1]) / chunk_size)
+local last = math.floor((tonumber(ARGV[2]) - 1) / chunk_size)
+return {false, first * chunk_size, redis.call('LRANGE', key, first, last)}
+"""
+
+PROMOTE_SCRIPT = ADD_REF_LUA + """
+if redis.call('HGET', KEYS[1], 'd') ~= 'disk' then
+    return 0
+end
+local chunks = {}
+for i = 3, #ARGV do
+    table.insert(chunks, ARGV[i])
+end
+local fields = redis.call('HMGET', KEYS[1], 's', 'x')
+add_ref(
+    KEYS[2], KEYS[3], KEYS[4], write_chunks(chunks),
+    fields[1], ARGV[1], fields[2], ARGV[2]
+)
+redis.call('HDEL', KEYS[1], 'd')
+redis.call('UNLINK', KEYS[5])
+return 1
+"""
+
+DELETE_SCRIPT = SHARE_BLOBS_LUA + CAPACITY_LUA + """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'none' then
+    return {0, false}
+end
+local blobs = share_blobs(KEYS[1], kind)
+local disk_blob = false
+if kind == 'hash' then
+    local owner = redis.call('HGET', KEYS[1], 'o')
+    if owner then
+        redis.call('ZREM', 'user:' .. owner .. ':shares', ARGV[1])
+    end
+    if redis.call('HGET', KEYS[1], 'd') == 'disk' then
+        disk_blob = redis.call('HGET', KEYS[1], 'b')
+        redis.call('UNLINK', KEYS[2])
+    end
+    local share = redis.call('HMGET', KEYS[1], 'l', 'e', 's')
+    if share[2] then
+        untrack_capacity(KEYS[3], KEYS[4], ARGV[1], share[1], share[2], share[3])
+    end
+end
+redis.call('UNLINK', KEYS[1])
+for _, blob in ipairs(blobs) do
+    blob = 'blob:' .. blob
+    local refs = blob .. ':refs'
+    redis.call('ZREM', refs, ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', refs, '-inf', ARGV[2])
+    local latest = redis.call('ZRANGE', refs, -1, -1, 'WITHSCORES')
+    if #latest == 0 then
+        redis.call('UNLINK', blob, refs)
+    else
+        redis.call('EXPIREAT', blob, latest[2])
+        redis.call('EXPIREAT', refs, latest[2])
+    end
+end
+return {1, disk_blob}
+"""
+
+
+EXPIRE_CAPACITY_SCRIPT = CAPACITY_LUA + """
+return expire_capacity(KEYS[1], KEYS[2], ARGV[1], ARGV[2])
+"""
+
+
+def file_key(share_id):
+    return f"file:{share_id}:data"
+
+
+def reads_key(share_id):
+    return f"file:{share_id}:reads"
+
+
+def user_index_key(owner):
+    return f"user:{owner}:shares"
+
+
+def staging_key(share_id):
+    return f"upload:{share_id}:chunks"
+
+
+def format_expiry(expires_at):
+    return datetime.fromtimestamp(expires_at, timezone.utc).strftime(EXPIRY_FORMAT)
+
+
+def expand_record(data):
+    return {
+        RECORD_FIELDS[key]: value for key, value in data.items() if key in RECORD_FIELDS
+    }
+
+
+def parse_record(record):
+    if isinstance(record, list):
+        fields = expand_record(
+            {
+                key.decode("utf-8"): value.decode("utf-8")
+                for key, value in zip(record[::2], record[1::2])
+            }
+        )
+        fields["expires_at"] = int(fields["expires_at"])
+        fields["size"] = int(fields["size"])
+        if "files" in fields:
+            fields["files"] = json.loads(fields["files"])
+        return fields
+
+    data = json.loads(record)
+    if data.get("v") == RECORD_VERSION:
+        return expand_record(data)
+    return data
+
+
+def share_metadata(fields):
+    metadata = {
+        "title": fields.get("title"),
+        "language": fields.get("language"),
+        "expiry_time": (
+            format_expiry(fields["expires_at"])
+            if "expires_at" in fields
+            else fields.get("expiry_time")
+        ),
+    }
+    if "size" in fields:
+        metadata["size"] = fields["size"]
+    if "files" in fields:
+        metadata["files"] = [
+            {key: file[key] for key in ("name", "language", "size")}
+            for file in fields["files"]
+        ]
+    return metadata
+
+
+class ChunkEncoder:
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.validator = codecs.getincrementaldecoder("utf-8")()
+        self.pending = bytearray()
+        self.size = 0
+        self.chunks = 0
+        self.stored = 0
+
+    def feed(self, piece):
+        self.digest.update(piece)
+        self.validator.decode(piece)
+        self.size += len(piece)
+        self.pending += piece
+
+        chunks = []
+        while len(self.pending) > STORAGE_CHUNK_SIZE:
+            chunks.append(self.encode(self.pending[:STORAGE_CHUNK_SIZE]))
+            del self.pending[:STORAGE_CHUNK_SIZE]
+        return chunks
+
+    def finish(self):
+        self.validator.decode(b"", final=True)
+        if self.pending or not self.chunks:
+            return [self.encode(self.pending)]
+        return []
+
+    def encode(self, data):
+        chunk = encode(bytes(data))
+        self.chunks += 1
+        self.stored += len(chunk)
+        return chunk
+
+    @property
+    def blob(self):
+        blob = self.digest.hexdigest()
+        if self.chunks > 1:
+            blob = f"{blob}:{STORAGE_CHUNK_SIZE}"
+        return blob
+
+
+def decode_blob(stored):
+    if isinstance(stored, list):
+        return b"".join(decode(chunk) for chunk in stored)
+    return decode(stored)
+
+
+def chunk_span(blob, start, stop):
+    if ":" not in blob:
+        return 0, -1, 0
+
+    chunk_size = int(blob.rsplit(":", 1)[1])
+    first = start // chunk_size
+    return first, (stop - 1) // chunk_size, first * chunk_size
+
+
+def share_etag(fields):
+    if not fields.get("blob") and not fields.get("files"):
+        return None
+
+    identity = "\0".join(
+        json.dumps(fields.get(key, ""), sort_keys=True)
+        for key in ("blob", "files", "title", "language", "expires_at", "expiry_time")
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+class Share:
+    def __init__(self, data, ttl, etag=None):
+        self.data = data
+        self.ttl = ttl
+        self.etag = etag
+
+
+class ShareStore:
+    def __init__(self, redis_client, disk=None, policy=None):
+        if isinstance(redis_client, RedisCluster):
+            raise ValueError(
+                "ShareStore needs a single Redis node: its scripts touch blob and "
+                "user index keys named inside share records"
+            )
+
+        self.client = redis_client
+        self.disk = disk
+        self.policy = policy
+        self.store_script = redis_client.register_script(STORE_SCRIPT)
+        self.bundle_store_script = redis_client.register_script(BUNDLE_STORE_SCRIPT)
+        self.load_script = redis_client.register_script(LOAD_SCRIPT)
+        self.delete_script = redis_client.register_script(DELETE_SCRIPT)
+        self.metadata_script = redis_client.register_script(METADATA_SCRIPT)
+        self.range_script = redis_client.register_script(RANGE_SCRIPT)
+        self.promote_script = redis_client.register_script(PROMOTE_SCRIPT)
+        self.expire_capacity_script = redis_client.register_script(
+            EXPIRE_CAPACITY_SCRIPT
+        )
+
+    def create(self, share_id, file_data, ttl, owner):
+        return self.create_from_chunks(
+            share_id,
+            file_data["title"],
+            file_data["language"],
+            [file_data["code"].encode("utf-8")],
+            ttl,
+            owner,
+        )
+
+    def create_from_chunks(self, share_id, title, language, pieces, ttl, owner):
+        now = int(time.time())
+        encoder = ChunkEncoder()
+        staging = staging_key(share_id)
+        chunks, staged = [], False
+
+        try:
+            for piece in pieces:
+                chunks += encoder.feed(piece)
+                if len(chunks) >= STAGING_BATCH_CHUNKS:
+                    staged = True
+                    self.stage(staging, chunks)
+                    chunks = []
+
+            chunks += encoder.finish()
+            if encoder.size == 0:
+                raise ValueError("Code is empty")
+            if staged:
+                self.stage(staging, chunks)
+                chunks = []
+
+            blob = encoder.blob
+            blob_key = f"blob:{blob}"
+
+            tier, stored = REDIS_TIER, encoder.stored
+            if (
+                self.disk is not None
+                and self.policy.tier_for(encoder.size, ttl) == DISK_TIER
+            ):
+                stored = self.disk.put(
+                    blob,
+                    self.staged_chunks(staging) if staged else chunks,
+                    share_id,
+                    now + ttl,
+                )
+                tier, chunks = DISK_TIER, []
+
+            keys = [
+                blob_key,
+                f"{blob_key}:refs",
+                file_key(share_id),
+                STORAGE_STATS_KEY,
+                user_index_key(owner),
+                CAPACITY_STATS_KEY,
+                CAPACITY_PENDING_KEY,
+            ]
+            args = [
+                blob,
+                share_id,
+                now + ttl,
+                now,
+                title,
+                ttl,
+                encoder.size,
+                language,
+                owner,
+                tier,
+            ]
+            if staged:
+                keys.append(staging)
+            if staged or tier == DISK_TIER:
+                args.append(stored)
+
+            self.store_script(keys=keys, args=args + chunks)
+        except Exception:
+            if staged:
+                with suppress(Exception):
+                    self.client.unlink(staging)
+            raise
+
+        return encoder.size
+
+    def stage(self, staging, chunks):
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.rpush(staging, *chunks)
+        pipeline.expire(staging, STAGING_TTL)
+        pipeline.execute()
+
+    def staged_chunks(self, staging):
+        start = 0
+        while True:
+            chunks = self.client.lrange(
+                staging, start, start + STAGING_BATCH_CHUNKS - 1
+            )
+            yield from chunks
+            if len(chunks) < STAGING_BATCH_CHUNKS:
+                return
+            start += len(chunks)
+
+    def create_bundle(self, share_id, title, files, ttl, owner):
+        now = int(time.time())
+        keys = [
+            file_key(share_id),
+            STORAGE_STATS_KEY,
+            user_index_key(owner),
+            CAPACITY_STATS_KEY,
+            CAPACITY_PENDING_KEY,
+        ]
+        codes = []
+        manifest = []
+
+        for file in files:
+            code = file["code"].encode("utf-8")
+            blob = hashlib.sha256(code).hexdigest()
+            keys += [f"blob:{blob}", f"blob:{blob}:refs"]
+            codes += [encode(code), len(code)]
+            manifest.append(
+                {
+                    "name": file["name"],
+                    "language": file["language"],
+                    "blob": blob,
+                    "size": len(code),
+                }
+            )
+
+        return self.bundle_store_script(
+            keys=keys,
+            args=[
+                share_id,
+                now + ttl,
+                now,
+                ttl,
+                title,
+                json.dumps(manifest, separators=(",", ":")),
+                sum(file["size"] for file in manifest),
+                BUNDLE_LANGUAGE,
+                owner,
+            ]
+            + codes,
+        )
+
+    def get(self, share_id, retry=True):
+        record, ttl, codes = self.load_script(keys=[file_key(share_id)])
+        if record is None:
+            return Share(None, ttl)
+
+        fields = parse_record(record)
+        if fields.get("tier") == DISK_TIER:
+            codes = [self.load_from_disk(share_id, fields, ttl)]
+            if codes[0] is None and retry:
+                return self.get(share_id, retry=False)
+        if None in codes:
+            return Share(None, -2)
+        codes = [decode_blob(code).decode("utf-8") for code in codes]
+
+        metadata = share_metadata(fields)
+        data = {"title": metadata["title"]}
+
+        if "files" in fields:
+            data["files"] = [
+                {"name": file["name"], "language": file["language"], "code": code}
+                for file, code in zip(fields["files"], codes)
+            ]
+        else:
+            data["code"] = codes[0] if codes else fields.get("code")
+
+        data["language"] = metadata["language"]
+        data["expiry_time"] = metadata["expiry_time"]
+        return Share(data, ttl, share_etag(fields))
+
+    def load_from_disk(self, share_id, fields, ttl):
+        if self.disk is None:
+            return None
+
+        chunks = self.disk.get(fields["blob"])
+        if chunks is None:
+            return None
+
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.incr(reads_key(share_id))
+        pipeline.expire(reads_key(share_id), max(ttl, 1))
+        reads, _ = pipeline.execute()
+
+        if self.policy.should_promote(fields["size"], reads):
+            self.promote(share_id, fields["blob"], chunks)
+        return chunks
+
+    def promote(self, share_id, blob, chunks):
+        blob_key = f"blob:{blob}"
+        promoted = self.promote_script(
+            keys=[
+                file_key(share_id),
+                blob_key,
+                f"{blob_key}:refs",
+                STORAGE_STATS_KEY,
+                reads_key(share_id),
+            ],
+            args=[share_id, int(time.time())] + chunks,
+        )
+        if promoted:
+            self.disk.release(blob, share_id)
+
+    def read_range(self, share_id, start, stop, retry=True):
+        record, offset, chunks, *disk_blob = self.range_script(
+            keys=[file_key(share_id)], args=[start, stop]
+        )
+        if disk_blob:
+            blob = disk_blob[0].decode("utf-8")
+            first, last, offset = chunk_span(blob, start, stop)
+            chunks = self.disk.get(blob, first, last) if self.disk else None
+            if chunks is None and retry:
+                return self.read_range(share_id, start, stop, retry=False)
+
+        if record is not None:
+            code = parse_record(record).get("code")
+            return code.encode("utf-8")[start:stop] if code is not None else None
+
+        if not chunks or None in chunks:
+            return None
+        return b"".join(decode(chunk) for chunk in chunks)[
+            start - offset : stop - offset
+        ]
+
+    def metadata(self, share_id):
+        record, ttl = self.metadata_script(keys=[file_key(share_id)])
+        if record is None:
+            return Share(None, ttl)
+        fields = parse_record(record)
+        return Share(share_metadata(fields), ttl, share_etag(fields))
+
+    def metadata_many(self, share_ids):
+        pipeline = self.client.pipeline(transaction=False)
+        for share_id in share_ids:
+            self.metadata_script(keys=[file_key(share_id)], client=pipeline)
+
+        return {
+            share_id: (
+                dict(share_metadata(parse_record(record)), ttl=ttl)
+                if record is not None and ttl != -1
+                else None
+            )
+            for share_id, (record, ttl) in zip(share_ids, pipeline.execute())
+        }
+
+    def release_disk_blob(self, share_id, disk_blob):
+        if disk_blob is not None and self.disk is not None:
+            self.disk.release(disk_blob.decode("utf-8"), share_id)
+
+    def delete(self, share_id):
+        deleted, disk_blob = self.delete_script(
+            keys=[
+                file_key(share_id),
+                reads_key(share_id),
+                CAPACITY_STATS_KEY,
+                CAPACITY_PENDING_KEY,
+            ],
+            args=[share_id, int(time.time())],
+        )
+        self.release_disk_blob(share_id, disk_blob)
+        return deleted
+
+    def list_user_shares(self, owner, offset, limit):
+        index = user_index_key(owner)
+
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.zremrangebyscore(index, "-inf", int(time.time()))
+        pipeline.zrange(index, offset, offset + limit - 1)
+        pipeline.zcard(index)
+        _, share_ids, total = pipeline.execute()
+
+        share_ids = [share_id.decode("utf-8") for share_id in share_ids]
+        return self.metadata_many(share_ids), total
+
+    def delete_user_shares(self, owner, batch_size=500):
+        index = user_index_key(owner)
+        deleted = []
+
+        while True:
+            share_ids = self.client.zrange(index, 0, batch_size - 1)
+            if not share_ids:
+                break
+
+            now = int(time.time())
+            pipeline = self.client.pipeline(transaction=False)
+            share_ids = [share_id.decode("utf-8") for share_id in share_ids]
+            for share_id in share_ids:
+                self.delete_script(
+                    keys=[
+                        file_key(share_id),
+                        reads_key(share_id),
+                        CAPACITY_STATS_KEY,
+                        CAPACITY_PENDING_KEY,
+                    ],
+                    args=[share_id, now],
+                    client=pipeline,
+                )
+            pipeline.zrem(index, *share_ids)
+
+            for share_id, (removed, disk_blob) in zip(
+                share_ids, pipeline.execute()[:-1]
+            ):
+                self.release_disk_blob(share_id, disk_blob)
+                if removed:
+                    deleted.append(share_id)
+
+        self.client.unlink(index)
+        return deleted
+
+    def stats(self):
+        stats = {
+            key.decode(): int(value)
+            for key, value in self.client.hgetall(STORAGE_STATS_KEY).items()
+        }
+        raw_bytes = stats.get("raw_bytes", 0)
+        stored_bytes = stats.get("stored_bytes", 0)
+        stats["saved_bytes"] = raw_bytes - stored_bytes + stats.get("dedup_bytes", 0)
+        stats["compression_ratio"] = raw_bytes / stored_bytes if stored_bytes else None
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+    def capacity(self):
+        pipeline = self.client.pipeline(transaction=False)
+        self.expire_capacity_script(
+            keys=[CAPACITY_STATS_KEY, CAPACITY_PENDING_KEY],
+            args=[int(time.time()), CAPACITY_SWEEP_BATCH],
+            client=pipeline,
+        )
+        pipeline.hgetall(CAPACITY_STATS_KEY)
+        _, stats = pipeline.execute()
+
+        counts = {}
+        for field, value in stats.items():
+            group, metric = field.decode("utf-8").rsplit(":", 1)
+            counts.setdefault(group, {})[metric] = int(value)
+
+        capacity = dict(counts.pop("total", {"shares": 0, "bytes": 0}))
+        capacity["languages"] = {}
+        capacity["expiry"] = {}
+        for group, values in counts.items():
+            kind, name = group.split(":", 1)
+            if values["shares"]:
+                capacity["languages" if kind == "language" else kind][name] = values
+        return capacity
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 52)
+os.environ.setdefault("REDIS_SSL", "false")
+os.environ.setdefault("STORAGE_CHUNK_SIZE", "1000")
+os.environ.setdefault("STORAGE_DISK_PATH", "")
+
+import jwt
+import fakeredis
+import pytest
+from store import ShareStore
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeStrictRedis()
+
+
+@pytest.fixture
+def share_store(redis_client):
+    return ShareStore(redis_client)
+
+
+@pytest.fixture
+def tempfile_app(redis_client, share_store, monkeypatch):
+    import app
+    from near_cache import NearCache
+
+    monkeypatch.setattr(app, "share_store", share_store)
+    monkeypatch.setattr(app, "near_cache", NearCache(redis_client, 0))
+    monkeypatch.setattr(app, "is_human", lambda token: True)
+    return app
+
+
+@pytest.fixture
+def client(tempfile_app):
+    return tempfile_app.app.test_client()
+
+
+def auth_headers(user_id="user"):
+    token = jwt.encode({"userId": user_id}, os.environ["JWT_SECRET"], "HS512")
+    return {"Authorization": f"Bearer {token}", "X-Recaptcha-Token": "token"}
@@ -0,0 +1,55 @@
+import pytest
+from conftest import auth_headers
+
+FILES = [
+    {"name": "main.py", "language": "python", "code": "import util\n"},
+    {"name": "util.py", "language": "python", "code": "x = 1\n"},
+]
+
+
+def upload(client, **payload):
+    return client.post(
+        "/temp-files-upload",
+        json=dict({"title": "t", "expiryTime": 10, "files": FILES}, **payload),
+        headers=auth_headers(),
+    )
+
+
+def test_bundle_upload_round_trips(client):
+    response = upload(client)
+    share_id = response.json["fileUrl"].rsplit("/", 1)[1]
+
+    share = client.get(f"/file/{share_id}", headers={"X-File-ID": share_id})
+
+    assert response.status_code == 200
+    assert share.json["title"] == "t"
+    assert share.json["files"] == FILES
+
+
+def test_bundles_cannot_be_read_raw(client):
+    share_id = upload(client).json["fileUrl"].rsplit("/", 1)[1]
+
+    response = client.get(f"/file/{share_id}/raw", headers={"X-File-ID": share_id})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "payload, status",
+    [
+        ({"files": []}, 400),
+        ({"files": [{"name": "a.py", "language": "python"}]}, 400),
+        ({"files": [FILES[0], FILES[0]]}, 400),
+        ({"expiryTime": 7}, 400),
+    ],
+)
+def test_invalid_bundles_are_rejected(client, payload, status):
+    assert upload(client, **payload).status_code == status
+
+
+def test_oversized_bundles_are_rejected(client, tempfile_app, monkeypatch):
+    monkeypatch.setattr(tempfile_app, "MAX_BUNDLE_FILES", 1)
+    assert upload(client).status_code == 400
+
+    monkeypatch.setattr(tempfile_app, "MAX_BUNDLE_FILES", 10)
+    monkeypatch.setattr(tempfile_app, "MAX_BUNDLE_BYTES", 8)
+    assert upload(client).status_code == 413
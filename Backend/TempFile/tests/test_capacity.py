@@ -0,0 +1,79 @@
+import time
+import pytest
+import store
+import utils
+from conftest import auth_headers
+
+
+def share(code, language="python"):
+    return {"title": "t", "language": language, "code": code}
+
+
+def test_capacity_counts_by_language_and_expiry(share_store):
+    share_store.create("py-1", share("a" * 10), 600, "u")
+    share_store.create("py-2", share("b" * 20), 86400, "u")
+    share_store.create("js-1", share("c" * 30, "javascript"), 600, "u")
+
+    capacity = share_store.capacity()
+
+    assert capacity["shares"] == 3
+    assert capacity["bytes"] == 60
+    assert capacity["languages"] == {
+        "python": {"shares": 2, "bytes": 30},
+        "javascript": {"shares": 1, "bytes": 30},
+    }
+    assert capacity["expiry"] == {
+        "10": {"shares": 2, "bytes": 40},
+        "1440": {"shares": 1, "bytes": 20},
+    }
+
+
+def test_deleting_a_share_untracks_it_once(share_store):
+    share_store.create("py-1", share("a" * 10), 600, "u")
+
+    share_store.delete("py-1")
+    share_store.delete("py-1")
+
+    assert share_store.capacity() == {
+        "shares": 0,
+        "bytes": 0,
+        "languages": {},
+        "expiry": {},
+    }
+
+
+def test_expired_shares_are_swept_in_bounded_batches(
+    share_store, redis_client, monkeypatch
+):
+    for number in range(5):
+        share_store.create(f"py-{number}", share(str(number)), 600, "u")
+
+    later = time.time() + 601
+    monkeypatch.setattr(store.time, "time", lambda: later)
+    monkeypatch.setattr(store, "CAPACITY_SWEEP_BATCH", 2)
+
+    assert share_store.capacity()["shares"] == 3
+
+    share_store.create("py-new", share("new"), 600, "u")
+    assert redis_client.zcard(store.CAPACITY_PENDING_KEY) == 2
+    assert share_store.capacity()["shares"] == 1
+
+
+@pytest.mark.parametrize(
+    "path", ["/stats/redis", "/stats/storage", "/stats/capacity", "/stats/near-cache"]
+)
+def test_stats_need_the_admin_token(client, monkeypatch, path):
+    monkeypatch.setattr(utils, "ADMIN_TOKEN", "admin")
+
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get(path, headers=auth_headers()).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "admin"}).status_code == 200
+
+
+def test_stats_are_disabled_without_an_admin_token(client, monkeypatch):
+    monkeypatch.setattr(utils, "ADMIN_TOKEN", None)
+
+    assert (
+        client.get("/stats/capacity", headers={"X-Admin-Token": ""}).status_code == 403
+    )
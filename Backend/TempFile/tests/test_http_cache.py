@@ -0,0 +1,83 @@
+import pytest
+from conftest import auth_headers
+
+CODE = "".join(f"print({i})\n" for i in range(500))
+
+
+@pytest.fixture
+def share_id(client):
+    response = client.post(
+        "/temp-file-upload",
+        json={"title": "t", "expiryTime": 10, "code": CODE, "language": "python"},
+        headers=auth_headers(),
+    )
+    return response.json["fileUrl"].rsplit("/", 1)[1]
+
+
+def get(client, path, share_id, **headers):
+    return client.get(path, headers=dict(headers, **{"X-File-ID": share_id}))
+
+
+def test_file_has_validators_and_cache_headers(client, share_id):
+    response = get(client, f"/file/{share_id}", share_id)
+
+    assert response.status_code == 200
+    assert response.json["code"] == CODE
+    assert response.headers["ETag"]
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    assert "X-File-ID" in response.headers["Vary"]
+
+
+@pytest.mark.parametrize("suffix", ["", "-gzip", "-br"])
+def test_conditional_get_is_not_modified(client, share_id, suffix):
+    etag = get(client, f"/file/{share_id}", share_id).headers["ETag"]
+    tagged = f'{etag[:-1]}{suffix}"'
+
+    response = get(client, f"/file/{share_id}", share_id, **{"If-None-Match": tagged})
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == tagged
+
+
+def test_stale_etag_gets_the_file(client, share_id):
+    response = get(
+        client, f"/file/{share_id}", share_id, **{"If-None-Match": '"stale"'}
+    )
+    assert response.status_code == 200
+
+
+def test_conditional_get_of_missing_file(client):
+    response = get(client, "/file/py-missing", "py-missing", **{"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_raw_range_reads(client, share_id):
+    raw = CODE.encode("utf-8")
+
+    response = get(client, f"/file/{share_id}/raw", share_id, Range="bytes=990-2010")
+
+    assert response.status_code == 206
+    assert response.get_data() == raw[990:2011]
+    assert response.headers["Content-Range"] == f"bytes 990-2010/{len(raw)}"
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_raw_range_with_stale_if_range_sends_everything(client, share_id):
+    response = get(
+        client,
+        f"/file/{share_id}/raw",
+        share_id,
+        Range="bytes=0-9",
+        **{"If-Range": '"stale"'},
+    )
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == CODE
+
+
+def test_unsatisfiable_raw_range(client, share_id):
+    response = get(client, f"/file/{share_id}/raw", share_id, Range="bytes=99999-")
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CODE)}"
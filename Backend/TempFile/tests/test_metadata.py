@@ -0,0 +1,91 @@
+import json
+import time
+from conftest import auth_headers
+
+
+def upload(client, code="print(1)", title="t"):
+    response = client.post(
+        "/temp-file-upload",
+        json={"title": title, "expiryTime": 10, "code": code, "language": "python"},
+        headers=auth_headers(),
+    )
+    return response.json["fileUrl"].rsplit("/", 1)[1]
+
+
+def test_share_records_use_compact_fields(client, redis_client):
+    share_id = upload(client)
+
+    fields = redis_client.hgetall(f"file:{share_id}:data")
+    assert set(fields) == {b"t", b"l", b"x", b"s", b"b", b"o", b"e"}
+
+
+def test_legacy_json_records_are_still_read(share_store, redis_client):
+    expires_at = int(time.time()) + 600
+    redis_client.set("blob:abc", b"x = 1")
+    redis_client.set(
+        "file:py-compact:data",
+        json.dumps(
+            {"v": 1, "t": "compact", "l": "python", "x": expires_at, "b": "abc"}
+        ),
+        ex=600,
+    )
+    redis_client.set(
+        "file:py-inline:data",
+        json.dumps(
+            {
+                "title": "inline",
+                "language": "python",
+                "code": "y = 2",
+                "expiry_time": "2030-01-01 00:00:00 UTC",
+            }
+        ),
+        ex=600,
+    )
+
+    assert share_store.get("py-compact").data["code"] == "x = 1"
+    assert share_store.get("py-inline").data["code"] == "y = 2"
+    assert share_store.metadata("py-compact").data["title"] == "compact"
+    assert share_store.metadata("py-inline").data["size"] == 5
+
+
+def test_single_metadata_needs_the_matching_file_id(client):
+    share_id = upload(client, title="single")
+
+    assert client.get(f"/file/{share_id}/meta").status_code == 302
+    response = client.get(f"/file/{share_id}/meta", headers={"X-File-ID": share_id})
+    assert response.json["title"] == "single"
+    assert response.json["size"] == len("print(1)")
+
+
+def test_bulk_metadata_is_gated_per_share_id(client):
+    first, second = upload(client, title="first"), upload(client, title="second")
+
+    response = client.post(
+        "/files/meta",
+        json={"shareIds": [first, second, "python-missing"]},
+        headers={"X-File-ID": f"{first}, python-missing"},
+    )
+
+    files = response.json["files"]
+    assert files[first]["title"] == "first"
+    assert files[second] is None
+    assert files["python-missing"] is None
+
+
+def test_bulk_metadata_without_file_ids_reveals_nothing(client):
+    share_id = upload(client)
+
+    response = client.post("/files/meta", json={"shareIds": [share_id]})
+
+    assert response.status_code == 200
+    assert response.json == {"files": {share_id: None}}
+
+
+def test_bulk_metadata_validates_the_request(client, tempfile_app, monkeypatch):
+    monkeypatch.setattr(tempfile_app, "MAX_METADATA_BATCH", 2)
+
+    assert client.post("/files/meta", json={"shareIds": "x"}).status_code == 400
+    assert (
+        client.post("/files/meta", json={"shareIds": ["a", "b", "c"]}).status_code
+        == 400
+    )
@@ -0,0 +1,170 @@
+import os
+import time
+import pytest
+import redis
+import near_cache
+from near_cache import NearCache
+from types import SimpleNamespace
+from store import Share
+from conftest import auth_headers
+
+
+class ConfigClient:
+    def __init__(self, flags, refuse_get=False, refuse_set=False):
+        self.flags = flags
+        self.refuse_get = refuse_get
+        self.refuse_set = refuse_set
+        self.set_calls = []
+        self.connection_pool = SimpleNamespace(connection_kwargs={})
+
+    def config_get(self, name):
+        if self.refuse_get:
+            raise redis.ResponseError("unknown command 'CONFIG'")
+        return {name: self.flags}
+
+    def config_set(self, name, value):
+        if self.refuse_set:
+            raise redis.ResponseError("unknown command 'CONFIG'")
+        self.set_calls.append(value)
+        self.flags = value
+
+
+def share(code="x = 1", ttl=600):
+    return Share({"title": "t", "code": code}, ttl, "etag")
+
+
+@pytest.fixture
+def cache():
+    cache = NearCache(None, 10_000)
+    cache.pid = os.getpid()
+    return cache
+
+
+@pytest.mark.parametrize("flags", ["Kgxeh", "KA", "AKE"])
+def test_existing_notifications_are_detected(flags):
+    client = ConfigClient(flags)
+
+    assert NearCache(client, 1).notifications_enabled()
+    assert client.set_calls == []
+
+
+def test_config_set_is_opt_in(monkeypatch):
+    client = ConfigClient("")
+
+    assert not NearCache(client, 1).notifications_enabled()
+    assert client.set_calls == []
+
+    monkeypatch.setattr(near_cache, "NEAR_CACHE_CONFIGURE_NOTIFICATIONS", True)
+    assert NearCache(client, 1).notifications_enabled()
+    assert set(client.set_calls[0]) == set("Kgxeh")
+
+
+@pytest.mark.parametrize(
+    "client",
+    [ConfigClient("", refuse_get=True), ConfigClient("", refuse_set=True)],
+)
+def test_refused_config_falls_back_to_ttl_only(client, monkeypatch):
+    monkeypatch.setattr(near_cache, "NEAR_CACHE_CONFIGURE_NOTIFICATIONS", True)
+    cache = NearCache(client, 1)
+
+    assert not cache.notifications_enabled()
+    cache.listen()
+    assert cache.ttl_only
+
+
+def test_ttl_only_entries_expire_quickly(cache, monkeypatch):
+    monkeypatch.setattr(near_cache, "NEAR_CACHE_FALLBACK_TTL", 0.05)
+    cache.ttl_only = True
+    loads = []
+
+    def load(share_id):
+        loads.append(share_id)
+        return share()
+
+    cache.get("py-1", load)
+    hit = cache.get("py-1", load)
+    time.sleep(0.06)
+    cache.get("py-1", load)
+
+    assert loads == ["py-1", "py-1"]
+    assert hit.ttl > 500
+
+
+def test_invalidation_drops_entries_and_racing_loads(cache):
+    cache.connected = True
+    cache.get("py-1", lambda share_id: share())
+
+    cache.invalidate("py-1")
+    assert cache.peek("py-1") is None
+
+    def racing_load(share_id):
+        cache.invalidate(share_id)
+        return share("stale")
+
+    assert cache.get("py-1", racing_load).data["code"] == "stale"
+    assert cache.peek("py-1") is None
+    assert cache.loading == {}
+
+
+def test_entries_are_evicted_by_size(cache):
+    cache.connected = True
+    cache.max_bytes = 100
+
+    cache.get("py-1", lambda share_id: share("a" * 60))
+    cache.get("py-2", lambda share_id: share("b" * 60))
+
+    assert cache.peek("py-1") is None
+    assert cache.peek("py-2") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_nothing_is_cached_before_the_listener_is_ready(cache):
+    cache.get("py-1", lambda share_id: share())
+
+    assert cache.peek("py-1") is None
+
+
+def test_fakeredis_without_config_serves_ttl_only(redis_client, share_store):
+    cache = NearCache(redis_client, 10_000)
+    share_store.create(
+        "py-1", {"title": "t", "language": "python", "code": "x"}, 600, "u"
+    )
+
+    cache.get("py-1", share_store.get)
+    for _ in range(100):
+        if cache.ttl_only:
+            break
+        time.sleep(0.01)
+    cache.get("py-1", share_store.get)
+
+    assert cache.stats()["ttl_only"]
+    assert cache.peek("py-1").data["code"] == "x"
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_deleted_shares_leave_the_ttl_only_cache(
+    client, tempfile_app, redis_client, monkeypatch, bulk
+):
+    cache = NearCache(redis_client, 10_000)
+    cache.pid = os.getpid()
+    cache.ttl_only = True
+    monkeypatch.setattr(tempfile_app, "near_cache", cache)
+
+    response = client.post(
+        "/temp-file-upload",
+        json={"title": "t", "expiryTime": 10, "code": "x", "language": "python"},
+        headers=auth_headers(),
+    )
+    share_id = response.json["fileUrl"].rsplit("/", 1)[1]
+    client.get(f"/file/{share_id}", headers={"X-File-ID": share_id})
+    assert cache.peek(share_id) is not None
+
+    if bulk:
+        response = client.delete("/user/shares", headers=auth_headers())
+        assert response.json["deleted"] == 1
+    else:
+        client.delete(f"/file/{share_id}/delete", headers=auth_headers())
+
+    assert cache.peek(share_id) is None
+    response = client.get(f"/file/{share_id}", headers={"X-File-ID": share_id})
+    assert response.status_code == 404
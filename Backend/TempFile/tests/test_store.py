@@ -0,0 +1,150 @@
+import pytest
+from codec import STORAGE_CHUNK_SIZE
+from store import STAGING_BATCH_CHUNKS, ShareStore, staging_key
+
+CODE = "".join(f"line {i} é ünïcode\n" for i in range(2000))
+RAW = CODE.encode("utf-8")
+
+
+def pieces(data, size=333):
+    return (data[start : start + size] for start in range(0, len(data), size))
+
+
+def blob_key(redis_client, share_id):
+    blob = redis_client.hget(f"file:{share_id}:data", "b").decode("utf-8")
+    return f"blob:{blob}"
+
+
+def test_small_share_round_trips(share_store, redis_client):
+    share_store.create(
+        "python-1", {"title": "t", "language": "python", "code": "x = 1"}, 600, "u"
+    )
+
+    share = share_store.get("python-1")
+    assert share.data["code"] == "x = 1"
+    assert share.data["title"] == "t"
+    assert 0 < share.ttl <= 600
+    assert redis_client.type(blob_key(redis_client, "python-1")) == b"string"
+
+
+def test_large_share_is_staged_in_batches(share_store, redis_client, monkeypatch):
+    batches = []
+    stage = share_store.stage
+    monkeypatch.setattr(
+        share_store,
+        "stage",
+        lambda key, chunks: (batches.append(len(chunks)), stage(key, chunks)),
+    )
+
+    size = share_store.create_from_chunks("py-2", "t", "python", pieces(RAW), 600, "u")
+
+    assert size == len(RAW)
+    assert len(batches) > 1
+    assert max(batches) <= STAGING_BATCH_CHUNKS
+    assert redis_client.exists(staging_key("py-2")) == 0
+    assert redis_client.llen(blob_key(redis_client, "py-2")) == -(
+        -len(RAW) // STORAGE_CHUNK_SIZE
+    )
+    assert share_store.get("py-2").data["code"] == CODE
+
+
+def test_failed_upload_discards_staged_chunks(share_store, redis_client):
+    def broken():
+        yield from pieces(RAW[: STORAGE_CHUNK_SIZE * (STAGING_BATCH_CHUNKS + 2)])
+        raise OSError("client went away")
+
+    with pytest.raises(OSError):
+        share_store.create_from_chunks("py-3", "t", "python", broken(), 600, "u")
+
+    assert redis_client.keys("upload:*") == []
+    assert redis_client.keys("blob:*") == []
+
+
+@pytest.mark.parametrize("data", [b"", b"\xff\xfe"])
+def test_empty_or_invalid_uploads_are_rejected(share_store, data):
+    with pytest.raises(ValueError):
+        share_store.create_from_chunks("py-4", "t", "python", [data], 600, "u")
+
+
+def test_identical_uploads_share_one_blob(share_store, redis_client):
+    share_store.create_from_chunks("py-5", "a", "python", pieces(RAW), 600, "u")
+    share_store.create_from_chunks("py-6", "b", "python", pieces(RAW, 4096), 600, "u")
+
+    key = blob_key(redis_client, "py-5")
+    assert key == blob_key(redis_client, "py-6")
+    assert redis_client.zcard(f"{key}:refs") == 2
+    assert redis_client.keys("upload:*") == []
+
+    stats = share_store.stats()
+    assert stats["blobs_written"] == 1
+    assert stats["dedup_hits"] == 1
+    assert stats["dedup_bytes"] == len(RAW)
+
+    share_store.delete("py-5")
+    assert share_store.get("py-6").data["code"] == CODE
+    share_store.delete("py-6")
+    assert redis_client.exists(key, f"{key}:refs") == 0
+
+
+@pytest.mark.parametrize(
+    "start, stop",
+    [(0, 1), (0, 100), (990, 2010), (len(RAW) - 7, len(RAW)), (0, len(RAW))],
+)
+def test_read_range_spans_chunks(share_store, start, stop):
+    share_store.create_from_chunks("py-7", "t", "python", pieces(RAW), 600, "u")
+
+    assert share_store.read_range("py-7", start, stop) == RAW[start:stop]
+
+
+def test_read_range_of_single_chunk_share(share_store):
+    share_store.create(
+        "py-8", {"title": "t", "language": "python", "code": "hello world"}, 600, "u"
+    )
+
+    assert share_store.read_range("py-8", 6, 11) == b"world"
+    assert share_store.read_range("missing", 0, 1) is None
+
+
+def test_bundle_round_trips_and_dedups_files(share_store, redis_client):
+    files = [
+        {"name": "a.py", "language": "python", "code": "print(1)"},
+        {"name": "b.py", "language": "python", "code": "print(1)"},
+    ]
+    share_store.create_bundle("bundle-1", "t", files, 600, "u")
+
+    share = share_store.get("bundle-1")
+    assert [file["code"] for file in share.data["files"]] == ["print(1)", "print(1)"]
+    assert len(redis_client.keys("blob:*:refs")) == 1
+
+
+def test_user_index_lists_and_deletes_shares(share_store, redis_client):
+    for number in range(3):
+        share_store.create(
+            f"py-{number}",
+            {"title": str(number), "language": "python", "code": f"x = {number}"},
+            600,
+            "owner",
+        )
+    share_store.create(
+        "other", {"title": "o", "language": "python", "code": "y"}, 600, "other"
+    )
+
+    shares, total = share_store.list_user_shares("owner", 0, 2)
+    assert total == 3
+    assert len(shares) == 2
+
+    assert sorted(share_store.delete_user_shares("owner", batch_size=2)) == [
+        "py-0",
+        "py-1",
+        "py-2",
+    ]
+    assert share_store.list_user_shares("owner", 0, 10) == ({}, 0)
+    assert share_store.get("other").data["code"] == "y"
+
+
+def test_cluster_clients_are_refused():
+    from redis.cluster import RedisCluster
+
+    client = RedisCluster.__new__(RedisCluster)
+    with pytest.raises(ValueError):
+        ShareStore(client)
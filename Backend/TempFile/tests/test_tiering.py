@@ -0,0 +1,218 @@
+import time
+import pytest
+import tiering
+from store import ShareStore
+from tiering import (
+    BlobStore,
+    SqliteBlobStore,
+    TieringPolicy,
+    create_disk_tier,
+    register_disk_backend,
+)
+
+CODE = "".join(f"print({i})\n" for i in range(3000))
+RAW = CODE.encode("utf-8")
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return SqliteBlobStore(str(tmp_path / "shares.db"), 0, 0)
+
+
+@pytest.fixture
+def tiered_store(redis_client, disk):
+    return ShareStore(redis_client, disk, TieringPolicy(1440, 10_000, 3))
+
+
+def create(store, share_id, data=RAW, ttl=600):
+    pieces = (data[start : start + 4096] for start in range(0, len(data), 4096))
+    return store.create_from_chunks(share_id, "t", "python", pieces, ttl, "u")
+
+
+def test_policy_picks_the_tier():
+    policy = TieringPolicy(1440, 10_000, 3)
+
+    assert policy.tier_for(100, 600) == "redis"
+    assert policy.tier_for(10_000, 600) == "disk"
+    assert policy.tier_for(100, 86400) == "disk"
+    assert policy.should_promote(100, 3)
+    assert not policy.should_promote(10_000, 3)
+    assert not TieringPolicy(1440, 10_000, 0).should_promote(100, 100)
+
+
+def test_large_shares_live_on_disk(tiered_store, redis_client, disk):
+    create(tiered_store, "py-1")
+
+    assert redis_client.keys("blob:*") == []
+    assert redis_client.keys("upload:*") == []
+    assert tiered_store.get("py-1").data["code"] == CODE
+    assert tiered_store.read_range("py-1", 1000, 5000) == RAW[1000:5000]
+    assert disk.stats()["refs"] == 1
+
+
+def test_disk_writes_are_counted_in_storage_stats(tiered_store, disk):
+    create(tiered_store, "py-1")
+    create(tiered_store, "py-2")
+
+    stats = tiered_store.stats()
+    assert stats["blobs_written"] == 1
+    assert stats["raw_bytes"] == len(RAW)
+    assert stats["disk_bytes"] == stats["stored_bytes"] == disk.stats()["stored_bytes"]
+    assert stats["dedup_hits"] == 1
+    assert stats["dedup_bytes"] == len(RAW)
+    assert stats["disk"]["refs"] == 2
+
+
+def test_deleting_disk_shares_releases_blobs(tiered_store, disk):
+    create(tiered_store, "py-1")
+    create(tiered_store, "py-2")
+
+    tiered_store.delete("py-1")
+    assert disk.stats()["blobs"] == 1
+    tiered_store.delete("py-2")
+    assert disk.stats() == {"blobs": 0, "refs": 0, "stored_bytes": 0}
+
+
+def test_hot_small_shares_are_promoted(tiered_store, redis_client, disk):
+    create(tiered_store, "py-1", b"x = 1\n" * 10, ttl=86400)
+    assert redis_client.keys("blob:*") == []
+
+    for _ in range(3):
+        assert tiered_store.get("py-1").data["code"] == "x = 1\n" * 10
+
+    assert redis_client.hget("file:py-1:data", "d") is None
+    assert len(redis_client.keys("blob:*")) == 2
+    assert disk.stats()["refs"] == 0
+    assert tiered_store.get("py-1").data["code"] == "x = 1\n" * 10
+
+
+def test_sweep_removes_expired_blobs(disk):
+    now = int(time.time())
+    disk.put("old", [b"a"], "py-1", now - 1)
+    disk.put("new", [b"b"], "py-2", now + 600)
+
+    disk.sweep(now)
+
+    assert disk.get("old") is None
+    assert disk.get("new") == [b"b"]
+
+
+def test_sweeper_runs_in_the_background(tmp_path):
+    disk = SqliteBlobStore(str(tmp_path / "shares.db"), 0, 0.05)
+    disk.put("old", [b"a"], "py-1", int(time.time()) - 1)
+
+    for _ in range(100):
+        if disk.get("old") is None:
+            break
+        time.sleep(0.02)
+
+    assert disk.get("old") is None
+
+
+def test_put_does_not_sweep(disk, monkeypatch):
+    monkeypatch.setattr(disk, "sweep", lambda now: pytest.fail("swept during put"))
+
+    assert disk.put("blob", [b"abc", b"de"], "py-1", int(time.time()) - 1) == 5
+    assert disk.put("blob", [b"abc", b"de"], "py-2", int(time.time())) == 0
+
+
+def recount(disk):
+    connection = disk.connection()
+    blobs, stored_bytes = connection.execute(
+        "SELECT COUNT(DISTINCT blob), COALESCE(SUM(LENGTH(data)), 0) FROM chunks"
+    ).fetchone()
+    (refs,) = connection.execute("SELECT COUNT(*) FROM refs").fetchone()
+    return {"blobs": blobs, "refs": refs, "stored_bytes": stored_bytes}
+
+
+def test_stats_counters_track_writes_releases_and_sweeps(disk):
+    now = int(time.time())
+    disk.put("a", [b"abc", b"de"], "py-1", now + 600)
+    disk.put("a", [b"abc", b"de"], "py-2", now + 600)
+    disk.put("a", [b"abc", b"de"], "py-2", now + 900)
+    disk.put("b", [b"xyz"], "py-3", now - 1)
+    assert disk.stats() == recount(disk) == {"blobs": 2, "refs": 3, "stored_bytes": 8}
+
+    disk.release("a", "py-1")
+    disk.release("a", "py-1")
+    assert disk.stats() == recount(disk) == {"blobs": 2, "refs": 2, "stored_bytes": 8}
+
+    disk.sweep(now)
+    assert disk.stats() == recount(disk) == {"blobs": 1, "refs": 1, "stored_bytes": 5}
+
+    disk.release("a", "py-2")
+    assert disk.stats() == recount(disk) == {"blobs": 0, "refs": 0, "stored_bytes": 0}
+
+
+def test_counters_are_seeded_for_existing_databases(tmp_path):
+    path = str(tmp_path / "shares.db")
+    disk = SqliteBlobStore(path, 0, 0)
+    disk.put("a", [b"abc", b"de"], "py-1", int(time.time()) + 600)
+    with disk.connection() as connection:
+        connection.execute("DROP TABLE blobs")
+        connection.execute("DROP TABLE counters")
+
+    reopened = SqliteBlobStore(path, 0, 0)
+    assert reopened.stats() == {"blobs": 1, "refs": 1, "stored_bytes": 5}
+
+
+class DictBlobStore(BlobStore):
+    def __init__(self):
+        self.blobs = {}
+        self.refs = {}
+
+    def put(self, blob, chunks, share_id, expires_at):
+        stored = 0
+        if blob not in self.blobs:
+            self.blobs[blob] = list(chunks)
+            stored = sum(len(chunk) for chunk in self.blobs[blob])
+        self.refs[blob, share_id] = expires_at
+        return stored
+
+    def get(self, blob, first=0, last=-1):
+        chunks = self.blobs.get(blob)
+        return chunks[first : None if last < 0 else last + 1] if chunks else None
+
+    def release(self, blob, share_id):
+        self.refs.pop((blob, share_id), None)
+        if all(ref != blob for ref, _ in self.refs):
+            self.blobs.pop(blob, None)
+
+    def sweep(self, now):
+        for blob, share_id in [key for key, at in self.refs.items() if at <= now]:
+            self.release(blob, share_id)
+
+    def stats(self):
+        return {"blobs": len(self.blobs), "refs": len(self.refs)}
+
+
+def test_registered_disk_backends_plug_into_the_share_store(redis_client, monkeypatch):
+    monkeypatch.setitem(
+        tiering.DISK_BACKENDS, "sqlite", tiering.DISK_BACKENDS["sqlite"]
+    )
+    register_disk_backend("memory", lambda path: DictBlobStore())
+    monkeypatch.setattr(tiering, "STORAGE_DISK_PATH", "unused")
+    monkeypatch.setattr(tiering, "STORAGE_DISK_BACKEND", "memory")
+
+    disk, policy = create_disk_tier()
+    store = ShareStore(redis_client, disk, policy)
+    create(store, "py-1", ttl=86400)
+
+    assert isinstance(disk, DictBlobStore)
+    assert redis_client.keys("blob:*") == []
+    assert store.get("py-1").data["code"] == CODE
+    assert store.read_range("py-1", 5000, 9000) == RAW[5000:9000]
+    assert store.stats()["disk_bytes"] == sum(
+        len(chunk) for chunks in disk.blobs.values() for chunk in chunks
+    )
+
+    store.delete("py-1")
+    assert disk.stats() == {"blobs": 0, "refs": 0}
+
+
+def test_unknown_disk_backends_are_refused(monkeypatch):
+    monkeypatch.setattr(tiering, "STORAGE_DISK_PATH", "unused")
+    monkeypatch.setattr(tiering, "STORAGE_DISK_BACKEND", "tape")
+
+    with pytest.raises(ValueError):
+        create_disk_tier()
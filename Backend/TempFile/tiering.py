@@ -0,0 +1,288 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_DISK_BACKEND = os.getenv("STORAGE_DISK_BACKEND", "sqlite").lower()
+STORAGE_DISK_PATH = os.getenv("STORAGE_DISK_PATH", "")
+STORAGE_DISK_MMAP_BYTES = int(
+    os.getenv("STORAGE_DISK_MMAP_BYTES", str(256 * 1024 * 1024))
+)
+STORAGE_DISK_SWEEP_INTERVAL = int(os.getenv("STORAGE_DISK_SWEEP_INTERVAL", "300"))
+TIER_DISK_MIN_EXPIRY = int(os.getenv("TIER_DISK_MIN_EXPIRY", "1440"))
+TIER_DISK_MIN_SIZE = int(os.getenv("TIER_DISK_MIN_SIZE", str(256 * 1024)))
+TIER_PROMOTE_READS = int(os.getenv("TIER_PROMOTE_READS", "20"))
+
+REDIS_TIER = "redis"
+DISK_TIER = "disk"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    blob TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (blob, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS refs (
+    blob TEXT NOT NULL,
+    share_id TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,
+    PRIMARY KEY (blob, share_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refs_expires_at ON refs (expires_at);
+CREATE TABLE IF NOT EXISTS blobs (
+    blob TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+SEED_BLOBS = """
+INSERT OR IGNORE INTO blobs (blob, size)
+SELECT blob, SUM(LENGTH(data)) FROM chunks GROUP BY blob
+"""
+
+SEED_COUNTERS = """
+INSERT INTO counters (name, value)
+SELECT 'blobs', COUNT(*) FROM blobs
+UNION ALL SELECT 'stored_bytes', COALESCE(SUM(size), 0) FROM blobs
+UNION ALL SELECT 'refs', COUNT(*) FROM refs
+"""
+
+logger = logging.getLogger("tiering")
+
+
+def count(connection, **deltas):
+    connection.executemany(
+        "UPDATE counters SET value = value + ? WHERE name = ?",
+        [(delta, name) for name, delta in deltas.items() if delta],
+    )
+
+
+class BlobStore:
+    def put(self, blob, chunks, share_id, expires_at):
+        raise NotImplementedError
+
+    def get(self, blob, first=0, last=-1):
+        raise NotImplementedError
+
+    def release(self, blob, share_id):
+        raise NotImplementedError
+
+    def sweep(self, now):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class SqliteBlobStore(BlobStore):
+    def __init__(self, path, mmap_bytes, sweep_interval):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self.sweep_interval = sweep_interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sweeper_pid = None
+
+    def connection(self):
+        if getattr(self.local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={self.mmap_bytes}")
+            connection.executescript(SCHEMA)
+            self.seed_counters(connection)
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+            self.start_sweeper()
+        return self.local.connection
+
+    def seed_counters(self, connection):
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("SELECT 1 FROM counters LIMIT 1").fetchone():
+                return
+            logger.info("Seeding disk tier counters from %s", self.path)
+            connection.execute(SEED_BLOBS)
+            connection.execute(SEED_COUNTERS)
+
+    def put(self, blob, chunks, share_id, expires_at):
+        stored = 0
+
+        def rows():
+            nonlocal stored
+            for seq, chunk in enumerate(chunks):
+                stored += len(chunk)
+                yield blob, seq, chunk
+
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            exists = connection.execute(
+                "SELECT 1 FROM blobs WHERE blob = ?", (blob,)
+            ).fetchone()
+            if not exists:
+                connection.executemany(
+                    "INSERT INTO chunks (blob, seq, data) VALUES (?, ?, ?)", rows()
+                )
+                connection.execute(
+                    "INSERT INTO blobs (blob, size) VALUES (?, ?)", (blob, stored)
+                )
+            referenced = connection.execute(
+                "SELECT 1 FROM refs WHERE blob = ? AND share_id = ?", (blob, share_id)
+            ).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO refs (blob, share_id, expires_at)"
+                " VALUES (?, ?, ?)",
+                (blob, share_id, expires_at),
+            )
+            count(
+                connection,
+                blobs=0 if exists else 1,
+                stored_bytes=stored,
+                refs=0 if referenced else 1,
+            )
+        return stored
+
+    def get(self, blob, first=0, last=-1):
+        rows = (
+            self.connection()
+            .execute(
+                "SELECT data FROM chunks WHERE blob = ? AND seq >= ?"
+                " AND (? < 0 OR seq <= ?) ORDER BY seq",
+                (blob, first, last, last),
+            )
+            .fetchall()
+        )
+        return [row[0] for row in rows] or None
+
+    def release(self, blob, share_id):
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            released = connection.execute(
+                "DELETE FROM refs WHERE blob = ? AND share_id = ?", (blob, share_id)
+            ).rowcount
+            orphan = connection.execute(
+                "SELECT size FROM blobs WHERE blob = ?"
+                " AND NOT EXISTS (SELECT 1 FROM refs WHERE blob = ?)",
+                (blob, blob),
+            ).fetchone()
+            if orphan:
+                connection.execute("DELETE FROM chunks WHERE blob = ?", (blob,))
+                connection.execute("DELETE FROM blobs WHERE blob = ?", (blob,))
+            count(
+                connection,
+                refs=-released,
+                blobs=-1 if orphan else 0,
+                stored_bytes=-orphan[0] if orphan else 0,
+            )
+
+    def start_sweeper(self):
+        if self.sweep_interval <= 0:
+            return
+
+        with self.lock:
+            if self.sweeper_pid == os.getpid():
+                return
+            self.sweeper_pid = os.getpid()
+
+        threading.Thread(target=self.sweep_forever, daemon=True).start()
+
+    def sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep(int(time.time()))
+            except sqlite3.Error as e:
+                logger.warning("Disk tier sweep failed: %s", e, exc_info=True)
+
+    def sweep(self, now):
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            expired = connection.execute(
+                "DELETE FROM refs WHERE expires_at <= ?", (now,)
+            ).rowcount
+            orphans = connection.execute(
+                "SELECT blob, size FROM blobs WHERE blob NOT IN (SELECT blob FROM refs)"
+            ).fetchall()
+            connection.executemany(
+                "DELETE FROM chunks WHERE blob = ?", [(blob,) for blob, _ in orphans]
+            )
+            connection.executemany(
+                "DELETE FROM blobs WHERE blob = ?", [(blob,) for blob, _ in orphans]
+            )
+            count(
+                connection,
+                refs=-expired,
+                blobs=-len(orphans),
+                stored_bytes=-sum(size for _, size in orphans),
+            )
+        if expired:
+            logger.info("Swept %s expired disk tier references", expired)
+
+    def stats(self):
+        counters = dict(
+            self.connection().execute("SELECT name, value FROM counters").fetchall()
+        )
+        return {
+            "blobs": counters["blobs"],
+            "refs": counters["refs"],
+            "stored_bytes": counters["stored_bytes"],
+        }
+
+
+class TieringPolicy:
+    def __init__(self, disk_min_expiry, disk_min_size, promote_reads):
+        self.disk_min_ttl = disk_min_expiry * 60
+        self.disk_min_size = disk_min_size
+        self.promote_reads = promote_reads
+
+    def tier_for(self, size, ttl):
+        if ttl >= self.disk_min_ttl or size >= self.disk_min_size:
+            return DISK_TIER
+        return REDIS_TIER
+
+    def should_promote(self, size, reads):
+        return (
+            self.promote_reads > 0
+            and reads >= self.promote_reads
+            and size < self.disk_min_size
+        )
+
+
+def create_sqlite_store(path):
+    return SqliteBlobStore(path, STORAGE_DISK_MMAP_BYTES, STORAGE_DISK_SWEEP_INTERVAL)
+
+
+DISK_BACKENDS = {"sqlite": create_sqlite_store}
+
+
+def register_disk_backend(name, factory):
+    DISK_BACKENDS[name] = factory
+
+
+def create_disk_tier():
+    if not STORAGE_DISK_PATH:
+        return None, None
+
+    factory = DISK_BACKENDS.get(STORAGE_DISK_BACKEND)
+    if factory is None:
+        raise ValueError(f"Unknown STORAGE_DISK_BACKEND: {STORAGE_DISK_BACKEND}")
+
+    logger.info(
+        "Disk tier enabled with %s at %s", STORAGE_DISK_BACKEND, STORAGE_DISK_PATH
+    )
+    return (
+        factory(STORAGE_DISK_PATH),
+        TieringPolicy(TIER_DISK_MIN_EXPIRY, TIER_DISK_MIN_SIZE, TIER_PROMOTE_READS),
+    )
@@ -1,66 +1,132 @@
 import os
+import hmac
 import jwt
 import redis
 import requests
+import time
 import logging
+import threading
 from functools import wraps
 from flask import request, jsonify
 from dotenv import load_dotenv
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(module)s - %(message)s"
-)
+logger = logging.getLogger("utils")
 
 SECRET_KEY = os.getenv("JWT_SECRET")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
+RECAPTCHA_VERIFY_URL = os.getenv(
+    "RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify"
+)
+
+REDIS_SSL = os.getenv("REDIS_SSL", "true").lower() == "true"
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "20"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", "3"))
+REDIS_BACKOFF_BASE = float(os.getenv("REDIS_BACKOFF_BASE", "0.05"))
+REDIS_BACKOFF_CAP = float(os.getenv("REDIS_BACKOFF_CAP", "1"))
+
+
+class MeteredConnectionPool(redis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_lock = threading.Lock()
+        self.metrics = {
+            "checkouts": 0,
+            "checkout_errors": 0,
+            "in_use": 0,
+            "max_in_use": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def get_connection(self, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except redis.RedisError:
+            with self.metrics_lock:
+                self.metrics["checkout_errors"] += 1
+            raise
+
+        with self.metrics_lock:
+            self.metrics["checkouts"] += 1
+            self.metrics["wait_seconds"] += time.monotonic() - started
+            self.metrics["in_use"] += 1
+            self.metrics["max_in_use"] = max(
+                self.metrics["max_in_use"], self.metrics["in_use"]
+            )
+        return connection
 
+    def release(self, connection):
+        super().release(connection)
+        with self.metrics_lock:
+            self.metrics["in_use"] = max(self.metrics["in_use"] - 1, 0)
+
+    def snapshot(self):
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["size"] = self.max_connections
+        metrics["connections"] = len(self._connections)
+        return metrics
+
+
+def create_redis_pool():
+    return MeteredConnectionPool(
+        max_connections=REDIS_POOL_SIZE,
+        timeout=REDIS_POOL_TIMEOUT,
+        connection_class=redis.SSLConnection if REDIS_SSL else redis.Connection,
+        host=os.getenv("REDIS_HOST"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        password=os.getenv("REDIS_PASSWORD"),
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(
+            ExponentialBackoff(cap=REDIS_BACKOFF_CAP, base=REDIS_BACKOFF_BASE),
+            REDIS_RETRIES,
+            supported_errors=(redis.ConnectionError, redis.TimeoutError),
+        ),
+    )
+
+
+redis_pool = create_redis_pool()
+redis_client = redis.StrictRedis(connection_pool=redis_pool)
 
-def get_redis_connection():
-    try:
-        redis_client = redis.StrictRedis(
-            host=os.getenv("REDIS_HOST"),
-            port=int(os.getenv("REDIS_PORT")),
-            password=os.getenv("REDIS_PASSWORD"),
-            ssl=True,
-        )
-        redis_client.ping()
-        logging.info("Successfully connected to Redis.")
-        return redis_client
-    except redis.ConnectionError as e:
-        logging.error(f"Redis connection error: {e}")
-        return None
-    except Exception as e:
-        logging.error(f"An unexpected error occurred while connecting to Redis: {e}")
-        return None
+
+def redis_pool_stats():
+    return redis_pool.snapshot()
 
 
 def is_human(recaptcha_token):
     if not recaptcha_token or not RECAPTCHA_SECRET_KEY:
-        logging.warning("reCAPTCHA check failed: Token or secret key is missing.")
+        logger.warning("reCAPTCHA check failed: Token or secret key is missing.")
         return False
 
     payload = {"secret": RECAPTCHA_SECRET_KEY, "response": recaptcha_token}
 
     try:
-        response = requests.post(
-            "https://www.google.com/recaptcha/api/siteverify", data=payload, timeout=50
-        )
+        response = requests.post(RECAPTCHA_VERIFY_URL, data=payload, timeout=50)
         response.raise_for_status()
         result = response.json()
 
         if result.get("success") and result.get("score", 0) > 0.5:
-            logging.info(
-                f"reCAPTCHA verification successful. Score: {result.get('score')}"
+            logger.info(
+                "reCAPTCHA verification successful. Score: %s", result.get("score")
             )
             return True
         else:
-            logging.warning(f"reCAPTCHA verification failed. Result: {result}")
+            logger.warning("reCAPTCHA verification failed. Result: %s", result)
             return False
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"reCAPTCHA request to Google failed: {e}")
+        logger.error("reCAPTCHA request to Google failed: %s", e, exc_info=True)
         return False
 
 
@@ -74,17 +140,35 @@ def token_required(f):
                 token = auth_header.split(" ")[1]
 
         if not token:
-            logging.warning("Access attempt without an Authorization token.")
+            logger.warning("Access attempt without an Authorization token.")
             return jsonify({"message": "Token is missing!"}), 403
 
         try:
-            decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS512"])
+            decoded = jwt.decode(
+                token, SECRET_KEY, algorithms=["HS512"], options={"require": ["userId"]}
+            )
             request.user_data = decoded
-            logging.info("Token successfully decoded.")
+            logger.info("Token successfully decoded.")
         except jwt.InvalidTokenError as e:
-            logging.warning(f"Invalid token received: {e}")
+            logger.warning("Invalid token received: %s", e)
             return jsonify({"message": "Invalid token!"}), 401
 
         return f(*args, **kwargs)
 
     return decorator
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorator(*args, **kwargs):
+        token = request.headers.get("X-Admin-Token", "")
+
+        if not ADMIN_TOKEN or not hmac.compare_digest(
+            token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")
+        ):
+            logger.warning("Rejected admin request to %s", request.path)
+            return jsonify({"message": "Admin token is missing or invalid!"}), 403
+
+        return f(*args, **kwargs)
+
+    return decorator